@@ -0,0 +1,117 @@
+import inspect
+
+from fastapi import APIRouter, Depends, params
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_db, get_async_db
+
+
+# =========================================================
+# MODO ASÍNCRONO DE LOS ROUTERS
+# =========================================================
+# Los handlers del proyecto son funciones síncronas que reciben
+# `db: Session = Depends(get_db)`. En modo asíncrono no duplicamos
+# cada endpoint: generamos una versión `async def` que recibe una
+# AsyncSession y ejecuta el handler original con `run_sync`.
+#
+# `run_sync` ejecuta el código síncrono dentro de un greenlet del
+# propio event loop: cada consulta se envía por el driver asíncrono
+# (asyncpg / aiosqlite) sin ocupar un hilo del threadpool.
+#
+# Por eso mismo el handler bloquea el event loop mientras calcula: los
+# endpoints con trabajo de CPU (agregar informes, leer una importación)
+# se marcan con @threadpool_endpoint y se quedan síncronos, con su
+# Session, en el threadpool de FastAPI.
+
+# Opciones de add_api_route que APIRoute guarda con el mismo nombre
+# (las que existan en la versión instalada de FastAPI)
+_ROUTE_OPTIONS = [
+    name
+    for name in inspect.signature(APIRouter.add_api_route).parameters
+    if name not in ("self", "path", "endpoint", "methods", "route_class_override")
+]
+
+
+def _sync_db_params(signature: inspect.Signature) -> list[str]:
+    # Parámetros declarados como Depends(get_db)
+    return [
+        name
+        for name, param in signature.parameters.items()
+        if isinstance(param.default, params.Depends)
+        and param.default.dependency is get_db
+    ]
+
+
+def threadpool_endpoint(endpoint):
+    """
+    Marca un endpoint síncrono para que también en modo asíncrono se
+    ejecute en el threadpool (con Session) y no dentro del event loop.
+    """
+    endpoint.threadpool = True
+    return endpoint
+
+
+def asyncify_endpoint(endpoint):
+    """
+    Devuelve una versión asíncrona del endpoint si depende de get_db.
+    Los endpoints que ya son async, no usan BD o están marcados con
+    @threadpool_endpoint se devuelven tal cual.
+    """
+    if inspect.iscoroutinefunction(endpoint) or getattr(endpoint, "threadpool", False):
+        return endpoint
+
+    signature = inspect.signature(endpoint)
+    db_params = _sync_db_params(signature)
+    if not db_params:
+        return endpoint
+
+    async def async_endpoint(**kwargs):
+        sessions = [kwargs.pop(name) for name in db_params]
+        async_db: AsyncSession = sessions[0]
+
+        def run(sync_db):
+            return endpoint(**kwargs, **{name: sync_db for name in db_params})
+
+        return await async_db.run_sync(run)
+
+    # FastAPI lee la firma para resolver dependencias:
+    # misma firma, pero con la sesión asíncrona
+    async_endpoint.__signature__ = signature.replace(
+        parameters=[
+            param.replace(default=Depends(get_async_db), annotation=AsyncSession)
+            if name in db_params
+            else param
+            for name, param in signature.parameters.items()
+        ]
+    )
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__qualname__ = endpoint.__qualname__
+    async_endpoint.__doc__ = endpoint.__doc__
+    async_endpoint.__module__ = endpoint.__module__
+
+    return async_endpoint
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """
+    Copia un router sustituyendo cada endpoint por su versión asíncrona,
+    con todas las demás opciones de cada ruta. Las rutas ya incluyen el
+    prefijo (y las dependencias y tags) del router original.
+    """
+    async_router = APIRouter()
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+
+        async_router.add_api_route(
+            route.path,
+            asyncify_endpoint(route.endpoint),
+            methods=list(route.methods),
+            route_class_override=type(route),
+            **{name: getattr(route, name) for name in _ROUTE_OPTIONS if hasattr(route, name)},
+        )
+
+    return async_router
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+
+from ..config import settings
+from .. import metrics
+from .. import models
+
+
+# =========================================================
+# CACHÉ TOKEN → USUARIO
+# =========================================================
+# get_current_user se ejecuta en cada petición autenticada. Guardamos
+# el resultado de decodificar el token y buscar el usuario, de modo que
+# las peticiones repetidas con el mismo token no tocan la BD.
+#
+# La caché es por proceso: cada worker tiene la suya. Una entrada vive
+# como mucho NEOCARE_AUTH_CACHE_TTL segundos y nunca más que el token.
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    email: str
+    created_at: Optional[datetime]
+
+    def to_model(self) -> models.User:
+        # Instancia desvinculada de cualquier sesión (solo lectura)
+        return models.User(id=self.id, email=self.email, created_at=self.created_at)
+
+
+class TokenUserCache:
+    """
+    LRU acotada con caducidad por entrada.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[CachedUser, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, token: str) -> Optional[CachedUser]:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, user: models.User, token_exp: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+
+        # Caduca con el TTL o con el propio token, lo que llegue antes
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+        if lifetime <= 0:
+            return
+
+        cached = CachedUser(id=user.id, email=user.email, created_at=user.created_at)
+        with self._lock:
+            self._entries[token] = (cached, time.monotonic() + lifetime)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [token for token, (cached, _) in self._entries.items() if cached.id == user_id]
+            for token in stale:
+                del self._entries[token]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+token_cache = TokenUserCache(
+    maxsize=settings.auth_cache_size,
+    ttl=settings.auth_cache_ttl,
+)
+
+metrics.register("auth_cache", token_cache.stats)
+
+
+# Cualquier cambio de un usuario vía ORM invalida sus tokens cacheados
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    token_cache.invalidate_user(target.id)
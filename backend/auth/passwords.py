@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from ..config import settings
+from .. import metrics
+
+
+# =============================
+# Hash de contraseñas (bcrypt)
+# =============================
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Estas dos funciones se ejecutan en los procesos del pool (este o el
+# de la CLI de alta masiva): deben ser funciones de módulo
+# (serializables con pickle). Calculan el bcrypt en el proceso actual.
+def bcrypt_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def bcrypt_verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPoolFull(Exception):
+    """La cola de bcrypt está llena: la petición debe reintentarse."""
+
+
+# =========================================================
+# POOL DE PROCESOS PARA BCRYPT
+# =========================================================
+class PasswordWorkerPool:
+    """
+    Ejecuta bcrypt en un pool de procesos dedicado.
+
+    - workers: procesos del pool (0 = ejecutar en el propio hilo)
+    - max_pending: trabajos en cola/en curso admitidos; por encima se
+      rechaza con PasswordPoolFull para que un pico de logins no deje
+      sin CPU al resto de endpoints.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Los procesos se crean con la primera contraseña, no al importar
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolFull()
+            self.pending += 1
+            self.submitted += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+            executor = self._get_executor()
+
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn, *args):
+        """
+        Ejecuta fn(*args) en el pool y espera el resultado.
+        Dentro de un greenlet de SQLAlchemy (modo asíncrono) la espera
+        se hace sobre el event loop en lugar de bloquearlo.
+        """
+        if self.workers <= 0:
+            return fn(*args)
+
+        future = self.submit(fn, *args)
+
+        from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+        if in_greenlet():
+            return await_only(asyncio.wrap_future(future))
+        return future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "max_pending_seen": self.max_pending_seen,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_pool = PasswordWorkerPool(
+    workers=settings.bcrypt_workers,
+    max_pending=settings.bcrypt_queue_limit,
+)
+
+metrics.register("bcrypt_pool", password_pool.stats)
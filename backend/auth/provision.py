@@ -0,0 +1,116 @@
+"""
+Alta masiva de usuarios con su tablero inicial.
+
+Uso:
+    python -m backend.auth.provision usuarios.csv [--batch-size 500] [--workers 4]
+
+El CSV debe tener cabecera con las columnas `email` y `password`.
+Cada fila se valida como en POST /auth/register (UserCreate: formato del
+email y contraseña de 8 a 72 caracteres) y el email se guarda igual que
+allí; las filas no válidas se indican por stderr y se omiten.
+Los emails ya registrados (o repetidos en el fichero) se omiten.
+Cada lote se inserta en una transacción: usuarios, tableros y listas
+con un INSERT multi-fila por tabla.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from .. import models
+from ..cards import models as cards_models  # noqa: F401  (registra los mappers)
+from ..worklogs import models as worklogs_models  # noqa: F401
+from ..boards.utils import provision_default_boards
+from .passwords import bcrypt_hash
+from .schemas import UserCreate
+
+
+def provision_batch(db: Session, rows: list[dict], executor: ProcessPoolExecutor) -> int:
+    """
+    Crea los usuarios del lote que no existan todavía.
+    Devuelve cuántos se han creado.
+    """
+    emails = [row["email"] for row in rows]
+    existing = set(
+        db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars()
+    )
+
+    pending = {}
+    for row in rows:
+        if row["email"] not in existing and row["email"] not in pending:
+            pending[row["email"]] = row["password"]
+
+    if not pending:
+        return 0
+
+    # bcrypt en paralelo en el pool de procesos
+    hashes = executor.map(bcrypt_hash, pending.values(), chunksize=16)
+
+    user_rows = db.execute(
+        insert(models.User).returning(models.User.id),
+        [
+            {"email": email, "password_hash": password_hash}
+            for email, password_hash in zip(pending.keys(), hashes)
+        ],
+    ).scalars().all()
+
+    provision_default_boards(db, list(user_rows))
+    db.commit()
+
+    return len(user_rows)
+
+
+def _read_batches(path: str, batch_size: int):
+    with open(path, newline="", encoding="utf-8") as f:
+        batch = []
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                user = UserCreate(email=row.get("email") or "", password=row.get("password") or "")
+            except ValidationError as exc:
+                reason = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors()
+                )
+                print(f"Línea {reader.line_num} omitida: {reason}", file=sys.stderr)
+                continue
+            batch.append({"email": user.email, "password": user.password})
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Alta masiva de usuarios")
+    parser.add_argument("csv_path")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    created = 0
+    seen = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for batch in _read_batches(args.csv_path, args.batch_size):
+            with SessionLocal() as db:
+                created += provision_batch(db, batch, executor)
+            seen += len(batch)
+            print(f"{seen} procesados, {created} creados", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    print(f"Usuarios creados: {created} de {seen} en {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
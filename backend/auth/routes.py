@@ -4,9 +4,11 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 
 from ..database import get_db
 from .. import models
+from ..boards.utils import provision_default_boards
 from . import schemas
 from .utils import (
     hash_password,
@@ -48,30 +50,30 @@ def register_user(payload: schemas.UserCreate, db: Session = Depends(get_db)):
         )
 
     # Creamos el usuario con la contraseña encriptada
+    # y su tablero inicial en la misma transacción
     user = models.User(
         email=payload.email,
         password_hash=hash_password(payload.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Otro registro con el mismo email se adelantó
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
 
-    # Tablero inicial por requisitos de la Semana 1
-    default_board = models.Board(name="Tablero principal", user_id=user.id)
-    db.add(default_board)
-    db.commit()
-    db.refresh(default_board)
-
-    # Listas básicas del tablero (Por hacer, En curso, Hecho)
-    default_lists = [
-        models.List(name="Por hacer", order=1, board_id=default_board.id),
-        models.List(name="En curso", order=2, board_id=default_board.id),
-        models.List(name="Hecho", order=3, board_id=default_board.id),
-    ]
-    db.add_all(default_lists)
+    # Tablero inicial + listas básicas (INSERT multi-fila)
+    provision_default_boards(db, [user.id])
+
+    # Serializamos antes del commit para no recargar el usuario después
+    result = schemas.UserOut.model_validate(user)
     db.commit()
 
-    return user
+    return result
 
 
 # ========================================================================
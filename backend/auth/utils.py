@@ -1,14 +1,17 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_async_db
 from .. import models
+from .cache import token_cache
+from .passwords import PasswordPoolFull, password_pool, bcrypt_hash, bcrypt_verify
 
 # =============================
 # Configuración de JWT
@@ -23,20 +26,34 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 # Configuración de seguridad
 # =============================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # FastAPI usará este esquema para extraer el token del header Authorization: Bearer <token>
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Variante sin error automático: para streams (EventSource no permite
+# cabeceras y el token puede llegar como ?token=...)
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
 # =============================
 # Utilidades de contraseña
 # =============================
 
+def _run_bcrypt(fn, *args):
+    # bcrypt corre en el pool de procesos; si la cola está llena → 503
+    try:
+        return password_pool.run(fn, *args)
+    except PasswordPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, inténtalo de nuevo en unos segundos",
+            headers={"Retry-After": str(settings.bcrypt_retry_after)},
+        )
+
+
 def hash_password(password: str) -> str:
     """
     Recibe una contraseña en texto plano y devuelve un hash seguro (bcrypt).
     """
-    return pwd_context.hash(password)
+    return _run_bcrypt(bcrypt_hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -44,7 +61,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Compara una contraseña en texto plano con su hash.
     Devuelve True si coinciden.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_bcrypt(bcrypt_verify, plain_password, hashed_password)
 
 # =============================
 # Utilidades para el token JWT
@@ -68,24 +85,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
-    """
-    Dependencia que:
-    - Lee el token del header Authorization.
-    - Lo valida y decodifica.
-    - Busca el usuario en la base de datos.
-    - Devuelve el usuario si todo es correcto.
-    """
-
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def decode_token(token: str) -> tuple[int, Optional[float]]:
+    """
+    Valida y decodifica el token JWT.
+    Devuelve el id de usuario del claim "sub" y la expiración ("exp"),
+    o lanza 401.
+    """
+
+    credentials_exception = _credentials_exception()
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id_raw = payload.get("sub")
@@ -94,15 +110,97 @@ def get_current_user(
 
         # El "sub" nos llega como string → lo convertimos a int
         try:
-            user_id = int(user_id_raw)
+            return int(user_id_raw), payload.get("exp")
         except (TypeError, ValueError):
             raise credentials_exception
 
     except JWTError:
         raise credentials_exception
 
+
+def _user_from_token(token: str, db: Session) -> models.User:
+    # Caché primero; si no está, decodificar y buscar en BD
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.to_model()
+
+    user_id, expires_at = decode_token(token)
+
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    token_cache.put(token, user, expires_at)
+    return user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> models.User:
+    """
+    Dependencia que:
+    - Lee el token del header Authorization.
+    - Lo valida y decodifica.
+    - Busca el usuario en la base de datos.
+    - Devuelve el usuario si todo es correcto.
+
+    Si el token ya está en la caché (token_cache) no se consulta la BD.
+    """
+    return _user_from_token(token, db)
+
+
+def get_current_user_stream(
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+    token: Optional[str] = Query(None, description="Token JWT (si no se envía cabecera)"),
+    db: Session = Depends(get_db),
+) -> models.User:
+    """
+    Igual que get_current_user, pero acepta el token también como
+    parámetro ?token= (EventSource del navegador no envía cabeceras).
+    """
+    raw_token = header_token or token
+    if not raw_token:
+        raise _credentials_exception()
+    return _user_from_token(raw_token, db)
 
+
+async def _user_from_token_async(token: str, db: AsyncSession) -> models.User:
+    # Como _user_from_token, con la AsyncSession de la petición
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.to_model()
+
+    user_id, expires_at = decode_token(token)
+
+    user = await db.get(models.User, user_id)
+    if user is None:
+        raise _credentials_exception()
+
+    token_cache.put(token, user, expires_at)
     return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """
+    Versión asíncrona de get_current_user (modo NEOCARE_ASYNC_DB=1).
+    Comparte la AsyncSession de la petición con el endpoint.
+    """
+    return await _user_from_token_async(token, db)
+
+
+async def get_current_user_stream_async(
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+    token: Optional[str] = Query(None, description="Token JWT (si no se envía cabecera)"),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """
+    Versión asíncrona de get_current_user_stream (modo NEOCARE_ASYNC_DB=1).
+    """
+    raw_token = header_token or token
+    if not raw_token:
+        raise _credentials_exception()
+    return await _user_from_token_async(raw_token, db)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import models
 from ..auth.utils import get_current_user
+from ..cards.utils import build_card_payloads
+from .utils import not_modified_response
 
 router = APIRouter(prefix="/boards", tags=["boards"])
 
@@ -33,6 +35,8 @@ def list_boards(
 @router.get("/{board_id}/lists")
 def get_board_lists(
     board_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -49,6 +53,10 @@ def get_board_lists(
     if not board:
         return {"detail": "No tienes acceso a este tablero"}
 
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
     lists = (
         db.query(models.List)
         .filter(models.List.board_id == board_id)
@@ -58,3 +66,60 @@ def get_board_lists(
 
     return lists
 
+
+# ---------------------------------------------------------
+# GET /boards/{board_id}/full
+# Tablero completo: listas en orden con sus tarjetas
+# (etiquetas, subtareas y horas) en una sola petición
+# ---------------------------------------------------------
+@router.get("/{board_id}/full")
+def get_board_full(
+    board_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    board = (
+        db.query(models.Board)
+        .filter(
+            models.Board.id == board_id,
+            models.Board.user_id == current_user.id
+        )
+        .first()
+    )
+
+    if not board:
+        raise HTTPException(status_code=403, detail="No tienes acceso a este tablero")
+
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
+    lists = (
+        db.query(models.List)
+        .filter(models.List.board_id == board_id)
+        .order_by(models.List.order)
+        .all()
+    )
+
+    # Número fijo de consultas (tablero + listas + 3 de tarjetas)
+    cards_by_list: dict[int, list[dict]] = {}
+    for card in build_card_payloads(db, board_id):
+        cards_by_list.setdefault(card["list_id"], []).append(card)
+
+    return {
+        "id": board.id,
+        "name": board.name,
+        "user_id": board.user_id,
+        "lists": [
+            {
+                "id": lst.id,
+                "board_id": lst.board_id,
+                "name": lst.name,
+                "order": lst.order,
+                "cards": cards_by_list.get(lst.id, []),
+            }
+            for lst in lists
+        ],
+    }
@@ -0,0 +1,110 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from .. import models
+
+
+# =========================================================
+# TABLERO INICIAL DE CADA USUARIO
+# =========================================================
+# Tablero inicial por requisitos de la Semana 1
+DEFAULT_BOARD_NAME = "Tablero principal"
+
+# Listas básicas del tablero (Por hacer, En curso, Hecho)
+DEFAULT_LISTS = [
+    ("Por hacer", 1),
+    ("En curso", 2),
+    ("Hecho", 3),
+]
+
+
+def _default_list_rows(board_id: int) -> list[dict]:
+    return [
+        {"board_id": board_id, "name": name, "order": order}
+        for name, order in DEFAULT_LISTS
+    ]
+
+
+def provision_default_boards(db: Session, user_ids: list[int]) -> dict[int, int]:
+    """
+    Crea el tablero inicial y sus listas para varios usuarios a la vez:
+    un INSERT multi-fila de tableros y otro de listas.
+    No hace commit. Devuelve {user_id: board_id}.
+    """
+    if not user_ids:
+        return {}
+
+    board_rows = db.execute(
+        insert(models.Board).returning(models.Board.id, models.Board.user_id),
+        [{"name": DEFAULT_BOARD_NAME, "user_id": user_id} for user_id in user_ids],
+    ).all()
+    board_by_user = {user_id: board_id for board_id, user_id in board_rows}
+
+    db.execute(
+        insert(models.List),
+        [row for board_id in board_by_user.values() for row in _default_list_rows(board_id)],
+    )
+
+    return board_by_user
+
+
+# =========================================================
+# VERSIÓN DEL TABLERO
+# =========================================================
+def touch_board(db: Session, board_id: int) -> int:
+    """
+    Incrementa la versión del tablero dentro de la transacción actual.
+    Debe llamarse en toda mutación de listas, tarjetas, etiquetas,
+    subtareas o worklogs. Devuelve la nueva versión.
+    """
+    return db.execute(
+        update(models.Board)
+        .where(models.Board.id == board_id)
+        .values(version=models.Board.version + 1)
+        .returning(models.Board.version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+
+# =========================================================
+# ETAG / IF-NONE-MATCH
+# =========================================================
+def board_etag(request: Request, board_id: int, version: int) -> str:
+    # ETag fuerte: versión del tablero + ruta y query de la petición
+    # (cada combinación de filtros es una representación distinta)
+    query = "&".join(sorted(request.url.query.split("&")))
+    raw = f"{board_id}:{version}:{request.url.path}?{query}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in header.split(","))
+
+
+def not_modified_response(
+    request: Request,
+    response: Response,
+    board: models.Board,
+) -> Optional[Response]:
+    """
+    Añade ETag a la respuesta. Si el cliente ya tiene esa versión
+    devuelve un 304 listo para retornar (sin ejecutar las consultas
+    pesadas); si no, devuelve None y el endpoint sigue normalmente.
+    """
+    etag = board_etag(request, board.id, board.version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
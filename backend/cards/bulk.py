@@ -0,0 +1,254 @@
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.boards.utils import touch_board
+from backend.changes.utils import record_tombstone
+from backend.cards.models import Card, Label, Subtask
+from backend.cards.ranking import last_rank, rank_between, rank_too_long
+from backend.cards.schemas import CardBulkRequest
+from backend.models import Board, List, User
+from backend.reportsweek.snapshots import invalidate_card_snapshots, invalidate_report_snapshots
+from backend.worklogs.models import WorkLog
+from backend.worklogs.rollup import delete_card_rollups
+
+
+# =========================================================
+# OPERACIONES EN LOTE SOBRE TARJETAS
+# =========================================================
+class BulkOutcome:
+    """Resultado de aplicar un lote: qué se hizo y qué hay que notificar."""
+
+    def __init__(self, results: list[dict]):
+        self.results = results
+        self.applied = False
+        # board_id → (versión, {"created": [...], "updated": [...], ...})
+        self.events: dict[int, tuple[int, dict]] = {}
+        # Listas cuyas claves de orden han crecido demasiado
+        self.rebalance_lists: set[int] = set()
+
+
+def _validate(db: Session, user: User, request: CardBulkRequest, results: list[dict]) -> dict:
+    """
+    Valida todas las operaciones con tres consultas (tarjetas, listas y
+    tableros del usuario) y marca los errores en `results`.
+    Devuelve {card_id: (board_id, list_id)} de las tarjetas implicadas.
+    """
+    operations = request.operations
+
+    card_ids = {op.card_id for op in operations if op.op != "create"}
+    cards = {
+        row.id: (row.board_id, row.list_id)
+        for row in db.query(Card.id, Card.board_id, Card.list_id).filter(Card.id.in_(card_ids))
+    } if card_ids else {}
+
+    list_ids = {op.list_id for op in operations if getattr(op, "list_id", None) is not None}
+    list_boards = dict(
+        db.query(List.id, List.board_id).filter(List.id.in_(list_ids)).all()
+    ) if list_ids else {}
+
+    board_ids = {board_id for board_id, _ in cards.values()}
+    board_ids |= {op.board_id for op in operations if op.op == "create"}
+    owned = set(db.scalars(
+        select(Board.id).where(Board.id.in_(board_ids), Board.user_id == user.id)
+    )) if board_ids else set()
+
+    def fail(index: int, detail: str) -> None:
+        results[index]["status"] = "error"
+        results[index]["detail"] = detail
+
+    seen: set[int] = set()
+    for index, op in enumerate(operations):
+        if op.op == "create":
+            if op.board_id not in owned:
+                fail(index, "No tienes permiso sobre este tablero.")
+            elif list_boards.get(op.list_id) != op.board_id:
+                fail(index, "La lista no pertenece al tablero.")
+            continue
+
+        card = cards.get(op.card_id)
+        if card is None:
+            fail(index, "Tarjeta no encontrada.")
+            continue
+
+        board_id, _list_id = card
+        if board_id not in owned:
+            fail(index, "No tienes permiso sobre este tablero.")
+        elif op.card_id in seen:
+            fail(index, "Solo se admite una operación por tarjeta.")
+        elif getattr(op, "list_id", None) is not None and list_boards.get(op.list_id) != board_id:
+            fail(index, "La lista no pertenece al tablero.")
+        elif op.op == "update" and op.title is not None and not op.title.strip():
+            fail(index, "El título no puede estar vacío.")
+        seen.add(op.card_id)
+
+    return cards
+
+
+def apply_bulk_operations(db: Session, user: User, request: CardBulkRequest) -> BulkOutcome:
+    """
+    Valida y aplica el lote en una sola transacción con SQL por
+    conjuntos: un INSERT para las altas, un UPDATE por forma de cambio
+    (executemany) y un DELETE por tabla para las bajas.
+
+    Con atomic=True cualquier error deja el lote sin aplicar; con
+    atomic=False se aplican las operaciones válidas.
+    """
+    operations = request.operations
+    results = [
+        {
+            "index": index,
+            "op": op.op,
+            "status": "ok",
+            "card_id": getattr(op, "card_id", None),
+            "detail": None,
+        }
+        for index, op in enumerate(operations)
+    ]
+    outcome = BulkOutcome(results)
+
+    cards = _validate(db, user, request, results)
+    has_errors = any(result["status"] == "error" for result in results)
+
+    if has_errors and request.atomic:
+        for result in results:
+            if result["status"] == "ok":
+                result["status"] = "skipped"
+        return outcome
+
+    valid = [(index, op) for index, op in enumerate(operations) if results[index]["status"] == "ok"]
+    if not valid:
+        return outcome
+
+    # -----------------------------------------------------
+    # Una versión nueva por tablero afectado (orden fijo: sin interbloqueos)
+    # -----------------------------------------------------
+    affected_boards = sorted({
+        op.board_id if op.op == "create" else cards[op.card_id][0]
+        for _index, op in valid
+    })
+    versions = {board_id: touch_board(db, board_id) for board_id in affected_boards}
+    changes = {board_id: defaultdict(list) for board_id in affected_boards}
+
+    # Informes guardados de las semanas afectadas: las de las tarjetas que
+    # se editan, mueven o borran (fechas actuales) y los vencimientos nuevos
+    invalidate_card_snapshots(db, [op.card_id for _index, op in valid if op.op != "create"])
+    due_dates = defaultdict(list)
+    for _index, op in valid:
+        if getattr(op, "due_date", None) is not None:
+            board_id = op.board_id if op.op == "create" else cards[op.card_id][0]
+            due_dates[board_id].append(op.due_date)
+    for board_id, dates in due_dates.items():
+        invalidate_report_snapshots(db, board_id, dates)
+
+    # Claves de orden: cada lista destino se lee una vez y se encadena
+    tails: dict[int, Optional[str]] = {}
+
+    def next_rank(list_id: int) -> str:
+        if list_id not in tails:
+            tails[list_id] = last_rank(db, list_id)
+        rank = rank_between(tails[list_id], None)
+        tails[list_id] = rank
+        if rank_too_long(rank):
+            outcome.rebalance_lists.add(list_id)
+        return rank
+
+    # -----------------------------------------------------
+    # Altas: un INSERT ... RETURNING
+    # -----------------------------------------------------
+    creates = [(index, op) for index, op in valid if op.op == "create"]
+    if creates:
+        rows = [
+            {
+                "title": op.title,
+                "description": op.description,
+                "due_date": op.due_date,
+                "board_id": op.board_id,
+                "list_id": op.list_id,
+                "rank": next_rank(op.list_id),
+                "user_id": user.id,
+                "row_version": versions[op.board_id],
+            }
+            for _index, op in creates
+        ]
+        new_ids = db.execute(
+            insert(Card).returning(Card.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        for (index, op), card_id in zip(creates, new_ids):
+            results[index]["card_id"] = card_id
+            changes[op.board_id]["created"].append(card_id)
+
+    # -----------------------------------------------------
+    # Ediciones y movimientos: un UPDATE por conjunto de columnas
+    # -----------------------------------------------------
+    updates_by_shape: dict[tuple, list[dict]] = defaultdict(list)
+    for _index, op in valid:
+        if op.op not in ("update", "move"):
+            continue
+
+        board_id, current_list_id = cards[op.card_id]
+        if op.op == "move":
+            values = {"list_id": op.list_id, "rank": next_rank(op.list_id)}
+        else:
+            values = op.model_dump(exclude_none=True, exclude={"op", "card_id"})
+            if values.get("list_id") == current_list_id:
+                del values["list_id"]
+            elif "list_id" in values:
+                values["rank"] = next_rank(values["list_id"])
+            if not values:
+                continue
+
+        shape = tuple(sorted(values))
+        updates_by_shape[shape].append({
+            "_card_id": op.card_id,
+            "_row_version": versions[board_id],
+            **{f"_{key}": value for key, value in values.items()},
+        })
+        changes[board_id]["moved" if op.op == "move" else "updated"].append(op.card_id)
+
+    cards_table = Card.__table__
+    for shape, params in updates_by_shape.items():
+        db.execute(
+            update(cards_table)
+            .where(cards_table.c.id == bindparam("_card_id"))
+            .values({
+                **{key: bindparam(f"_{key}") for key in shape},
+                "row_version": bindparam("_row_version"),
+                "updated_at": func.now(),
+            }),
+            params,
+        )
+
+    # -----------------------------------------------------
+    # Bajas: hijos y tarjetas con un DELETE por tabla
+    # -----------------------------------------------------
+    deletes = [op.card_id for _index, op in valid if op.op == "delete"]
+    if deletes:
+        delete_card_rollups(db, deletes)
+        for child in (Label, Subtask, WorkLog):
+            db.execute(
+                delete(child)
+                .where(child.card_id.in_(deletes))
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            delete(Card)
+            .where(Card.id.in_(deletes))
+            .execution_options(synchronize_session=False)
+        )
+        for card_id in deletes:
+            board_id = cards[card_id][0]
+            record_tombstone(db, board_id, "card", card_id, versions[board_id])
+            changes[board_id]["deleted"].append(card_id)
+
+    db.commit()
+
+    outcome.applied = True
+    outcome.events = {
+        board_id: (versions[board_id], dict(changes[board_id]))
+        for board_id in affected_boards
+    }
+    return outcome
@@ -0,0 +1,128 @@
+"""
+Recalcula los contadores desnormalizados de las tarjetas
+(total_hours, subtasks_total, subtasks_completed) a partir de
+worklogs y subtareas.
+
+Uso:
+    python -m backend.cards.counters [--board-id 12] [--dry-run]
+
+Solo se reescriben las tarjetas cuyos valores no cuadran; sus tableros
+reciben una versión nueva para que los clientes vuelvan a leerlas.
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..boards.utils import touch_board
+from ..worklogs.models import WorkLog
+from .models import Card, Subtask
+
+
+# Margen para comparar sumas de horas en coma flotante
+HOURS_TOLERANCE = 1e-6
+
+
+def _expected_counters():
+    hours = (
+        select(WorkLog.card_id, func.sum(WorkLog.hours).label("hours"))
+        .group_by(WorkLog.card_id)
+        .subquery()
+    )
+    subtasks = (
+        select(
+            Subtask.card_id,
+            func.count().label("total"),
+            func.sum(case((Subtask.completed, 1), else_=0)).label("completed"),
+        )
+        .group_by(Subtask.card_id)
+        .subquery()
+    )
+    expected_hours = func.coalesce(hours.c.hours, 0)
+    expected_total = func.coalesce(subtasks.c.total, 0)
+    expected_completed = func.coalesce(subtasks.c.completed, 0)
+
+    query = (
+        select(
+            Card.id,
+            Card.board_id,
+            expected_hours.label("total_hours"),
+            expected_total.label("subtasks_total"),
+            expected_completed.label("subtasks_completed"),
+        )
+        .outerjoin(hours, hours.c.card_id == Card.id)
+        .outerjoin(subtasks, subtasks.c.card_id == Card.id)
+        .where(or_(
+            func.abs(Card.total_hours - expected_hours) > HOURS_TOLERANCE,
+            Card.subtasks_total != expected_total,
+            Card.subtasks_completed != expected_completed,
+        ))
+    )
+    return query
+
+
+def repair_card_counters(db: Session, board_id: Optional[int] = None, dry_run: bool = False) -> int:
+    """
+    Corrige las tarjetas con contadores desajustados (de un tablero o
+    de todos). Devuelve cuántas tarjetas estaban mal.
+    Una consulta agrupada y un UPDATE en lote, no una por tarjeta.
+    """
+    query = _expected_counters()
+    if board_id is not None:
+        query = query.where(Card.board_id == board_id)
+
+    rows = db.execute(query).all()
+    if not rows or dry_run:
+        return len(rows)
+
+    versions = {
+        board: touch_board(db, board)
+        for board in sorted({row.board_id for row in rows})
+    }
+
+    cards = Card.__table__
+    db.execute(
+        update(cards)
+        .where(cards.c.id == bindparam("_card_id"))
+        .values({
+            "total_hours": bindparam("_total_hours"),
+            "subtasks_total": bindparam("_subtasks_total"),
+            "subtasks_completed": bindparam("_subtasks_completed"),
+            "row_version": bindparam("_row_version"),
+            "updated_at": cards.c.updated_at,
+        }),
+        [
+            {
+                "_card_id": row.id,
+                "_total_hours": float(row.total_hours),
+                "_subtasks_total": int(row.subtasks_total),
+                "_subtasks_completed": int(row.subtasks_completed),
+                "_row_version": versions[row.board_id],
+            }
+            for row in rows
+        ],
+    )
+    db.commit()
+    return len(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcular contadores de tarjetas")
+    parser.add_argument("--board-id", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        fixed = repair_card_counters(db, args.board_id, args.dry_run)
+
+    action = "desajustadas" if args.dry_run else "corregidas"
+    print(f"Tarjetas {action}: {fixed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
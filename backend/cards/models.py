@@ -3,12 +3,14 @@
 from sqlalchemy import (
     Column,
     Integer,
+    Float,
     String,
     Text,
     Date,
     DateTime,
     Boolean,
     ForeignKey,
+    Index,
     func
 )
 from sqlalchemy.orm import relationship
@@ -31,6 +33,12 @@ class Card(Base):
     description = Column(Text, nullable=True)
     due_date = Column(Date, nullable=True)
 
+    # Contadores desnormalizados: los mantienen los handlers de worklogs
+    # y subtareas en la misma transacción (ver changes/utils.py).
+    # Recalcular con: python -m backend.cards.counters
+    total_hours = Column(Float, nullable=False, default=0, server_default="0")
+    subtasks_total = Column(Integer, nullable=False, default=0, server_default="0")
+    subtasks_completed = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Timestamps
     created_at = Column(
@@ -45,6 +53,19 @@ class Card(Base):
         nullable=False
     )
 
+    # Posición dentro de la lista (rango fraccional, ver cards/ranking.py).
+    # En PostgreSQL con collation "C": el orden debe ser por bytes.
+    rank = Column(
+        String(255).with_variant(String(255, collation="C"), "postgresql"),
+        nullable=False,
+        default="",
+        server_default="",
+    )
+
+    # Versión del tablero en el último cambio de la tarjeta o de sus
+    # etiquetas/subtareas/worklogs (cursor de /boards/{id}/changes)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     board = relationship("Board", back_populates="cards")
     list = relationship("List", back_populates="cards")
@@ -53,6 +74,17 @@ class Card(Base):
     labels = relationship("Label", back_populates="card", cascade="all, delete-orphan")
     subtasks = relationship("Subtask", back_populates="card", cascade="all, delete-orphan")
 
+    # Índices de los filtros frecuentes (tablero, informes semanales,
+    # orden dentro de la lista y sincronización delta)
+    __table_args__ = (
+        Index("ix_cards_board_list", "board_id", "list_id", "rank"),
+        Index("ix_cards_board_created_at", "board_id", "created_at"),
+        Index("ix_cards_board_updated_at", "board_id", "updated_at"),
+        Index("ix_cards_board_due_date", "board_id", "due_date"),
+        Index("ix_cards_board_row_version", "board_id", "row_version"),
+        Index("ix_cards_list_rank", "list_id", "rank"),
+    )
+
 
 class Label(Base):
     # Etiqueta simple asociada a una tarjeta (nombre + color)
@@ -62,9 +94,14 @@ class Label(Base):
     card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(30), nullable=False)
     color = Column(String(20), nullable=False)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     card = relationship("Card", back_populates="labels")
 
+    __table_args__ = (
+        Index("ix_labels_card_id", "card_id"),
+    )
+
 
 class Subtask(Base):
     # Subtarea/checklist con estado de completado
@@ -74,5 +111,10 @@ class Subtask(Base):
     card_id = Column(Integer, ForeignKey("cards.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(100), nullable=False)
     completed = Column(Boolean, default=False, nullable=False)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     card = relationship("Card", back_populates="subtasks")
+
+    __table_args__ = (
+        Index("ix_subtasks_card_id", "card_id"),
+    )
@@ -0,0 +1,209 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.boards.utils import touch_board
+from backend.events.utils import publish_board_event
+from backend.cards.models import Card
+from backend.models import List
+
+
+logger = logging.getLogger("neocare.ranking")
+
+
+# =========================================================
+# RANGO FRACCIONAL DE LAS TARJETAS
+# =========================================================
+# La posición de una tarjeta en su lista es una cadena en base 36
+# ("0-9a-z") que se compara lexicográficamente. Entre dos claves
+# siempre cabe otra, así que mover una tarjeta solo escribe su fila.
+#
+# Las claves nunca terminan en "0": así siempre hay hueco por delante.
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Devuelve una clave estrictamente entre `before` y `after`.
+    None (o "") en un extremo significa "sin límite" por ese lado.
+
+    Al añadir al final (after=None) o al principio (before=None) se
+    avanza de un dígito en un dígito en lugar de ir a la mitad: las
+    inserciones repetidas en un extremo crecen mucho más despacio.
+    """
+    before = before or None
+    if after == "":
+        raise ValueError("No hay claves por debajo de ''")
+    if before is not None and after is not None and not before < after:
+        raise ValueError(f"Rango inválido: {before!r} >= {after!r}")
+
+    if before is None and after is None:
+        # Lista vacía: empezamos en el centro del alfabeto
+        return DIGITS[BASE // 2]
+
+    low = before or ""
+    high = after
+    result = []
+    i = 0
+
+    while True:
+        low_digit = DIGITS.index(low[i]) if i < len(low) else 0
+        high_digit = DIGITS.index(high[i]) if high is not None else BASE
+
+        if high_digit - low_digit > 1:
+            if before is None:
+                digit = high_digit - 1
+            elif after is None:
+                digit = low_digit + 1
+            else:
+                digit = (low_digit + high_digit) // 2
+            result.append(DIGITS[digit])
+            return "".join(result)
+
+        result.append(DIGITS[low_digit])
+        if high_digit - low_digit == 1:
+            # A partir de aquí ya somos menores que `after`
+            high = None
+        i += 1
+
+
+def evenly_spaced_ranks(count: int) -> list[str]:
+    # Claves equiespaciadas de la menor longitud que deja holgura
+    width = 1
+    while BASE ** width < (count + 1) * BASE:
+        width += 1
+
+    step = BASE ** width // (count + 1)
+    ranks = []
+    for position in range(1, count + 1):
+        value = position * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+def rank_too_long(rank: str) -> bool:
+    return len(rank) > settings.rank_max_length
+
+
+# ---------------------------------------------------------
+# Consultas de apoyo
+# ---------------------------------------------------------
+def last_rank(db: Session, list_id: int, exclude_card_id: Optional[int] = None) -> Optional[str]:
+    query = select(Card.rank).where(Card.list_id == list_id)
+    if exclude_card_id is not None:
+        query = query.where(Card.id != exclude_card_id)
+    return db.execute(query.order_by(Card.rank.desc(), Card.id.desc()).limit(1)).scalar()
+
+
+def rank_after(db: Session, list_id: int, rank: str, exclude_card_id: int) -> Optional[str]:
+    # Clave de la tarjeta que sigue a `rank` en la lista
+    return db.execute(
+        select(Card.rank)
+        .where(Card.list_id == list_id, Card.rank > rank, Card.id != exclude_card_id)
+        .order_by(Card.rank, Card.id)
+        .limit(1)
+    ).scalar()
+
+
+def rank_before(db: Session, list_id: int, rank: str, exclude_card_id: int) -> Optional[str]:
+    # Clave de la tarjeta que precede a `rank` en la lista
+    return db.execute(
+        select(Card.rank)
+        .where(Card.list_id == list_id, Card.rank < rank, Card.id != exclude_card_id)
+        .order_by(Card.rank.desc(), Card.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def ranks_around_position(
+    db: Session,
+    list_id: int,
+    position: int,
+    exclude_card_id: int,
+) -> tuple[Optional[str], Optional[str]]:
+    # Vecinos para colocar una tarjeta en la posición `position` (0 = primera)
+    offset = max(position - 1, 0)
+    ranks = db.execute(
+        select(Card.rank)
+        .where(Card.list_id == list_id, Card.id != exclude_card_id)
+        .order_by(Card.rank, Card.id)
+        .offset(offset)
+        .limit(2 if position > 0 else 1)
+    ).scalars().all()
+
+    if position == 0:
+        return None, (ranks[0] if ranks else None)
+    before = ranks[0] if ranks else None
+    after = ranks[1] if len(ranks) > 1 else None
+    if before is None:
+        # Posición más allá del final: al final de la lista
+        before = last_rank(db, list_id, exclude_card_id)
+    return before, after
+
+
+# ---------------------------------------------------------
+# Reequilibrado (tarea en segundo plano)
+# ---------------------------------------------------------
+def rebalance_list(list_id: int) -> None:
+    """
+    Reasigna claves cortas y equiespaciadas a todas las tarjetas de la
+    lista, conservando su orden. Solo se lanza cuando alguna clave supera
+    NEOCARE_RANK_MAX_LENGTH o hay empates, nunca en cada movimiento.
+    Abre su propia sesión: se ejecuta después de responder.
+    """
+    db = SessionLocal()
+    try:
+        board_id = db.query(List.board_id).filter(List.id == list_id).scalar()
+        if board_id is None:
+            return
+
+        # Primero el bloqueo del tablero: los movimientos concurrentes
+        # esperan y las tarjetas leídas siguen en la lista hasta el commit
+        version = touch_board(db, board_id)
+
+        card_ids = db.execute(
+            select(Card.id).where(Card.list_id == list_id).order_by(Card.rank, Card.id)
+        ).scalars().all()
+        if not card_ids:
+            db.rollback()
+            return
+
+        ranks = evenly_spaced_ranks(len(card_ids))
+
+        # Un único UPDATE ejecutado en lote; updated_at se conserva
+        cards = Card.__table__
+        db.execute(
+            update(cards)
+            .where(cards.c.id == bindparam("card_id"), cards.c.list_id == list_id)
+            .values(
+                rank=bindparam("new_rank"),
+                row_version=version,
+                updated_at=cards.c.updated_at,
+            ),
+            [
+                {"card_id": card_id, "new_rank": rank}
+                for card_id, rank in zip(card_ids, ranks)
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("No se pudo reequilibrar la lista %s", list_id)
+        return
+    finally:
+        db.close()
+
+    publish_board_event(board_id, version, "list.rebalanced", {
+        "list_id": list_id,
+        "ranks": [{"id": card_id, "rank": rank} for card_id, rank in zip(card_ids, ranks)],
+    })
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from sqlalchemy import func   # ✅ NUEVO
 
 from backend.database import get_db
 from backend.auth.utils import get_current_user
+from backend.boards.utils import not_modified_response, touch_board
+from backend.changes.utils import mark_card_changed, record_tombstone
+from backend.events.utils import event_data, publish_board_event
+from backend.reportsweek.snapshots import invalidate_card_snapshots, invalidate_report_snapshots
+from backend.worklogs.rollup import delete_card_rollups
 
 from backend.cards.schemas import (
     CardCreate,
     CardUpdate,
     CardResponse,
     CardDeleteResponse,
+    CardMove,
+    CardBulkRequest,
+    CardBulkResponse,
     LabelCreate,
     LabelOut,
     SubtaskCreate,
@@ -17,8 +26,19 @@ from backend.cards.schemas import (
     SubtaskOut,
 )
 from backend.cards.models import Card, Label, Subtask
+from backend.cards.utils import build_card_payloads
+from backend.cards.bulk import apply_bulk_operations
+from backend.cards.search import search_cards as run_card_search
+from backend.cards.ranking import (
+    last_rank,
+    rank_after,
+    rank_before,
+    rank_between,
+    rank_too_long,
+    ranks_around_position,
+    rebalance_list,
+)
 from backend.models import Board, List, User
-from backend.worklogs.models import WorkLog   
 
 
 router = APIRouter(
@@ -37,6 +57,7 @@ extras_router = APIRouter(
 @router.post("/", response_model=CardResponse)
 def create_card(
     card: CardCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -52,6 +73,15 @@ def create_card(
             detail="No tienes permiso para crear tarjetas en este tablero."
         )
 
+    # La lista destino debe ser del mismo tablero (el rank se calcula en ella)
+    list_obj = db.query(List.id).filter(
+        List.id == card.list_id,
+        List.board_id == board.id
+    ).first()
+
+    if not list_obj:
+        raise HTTPException(status_code=400, detail="La lista no pertenece al tablero.")
+
     # Buscar la lista "Por hacer"
     por_hacer_list = db.query(List).filter(
         List.board_id == board.id,
@@ -64,29 +94,67 @@ def create_card(
             detail="La lista 'Por hacer' no existe."
         )
 
-    # Crear tarjeta (SIN order)
+    # Crear tarjeta al final de su lista
     new_card = Card(
         title=card.title,
         description=card.description,
         due_date=card.due_date,
         board_id=board.id,
         list_id=card.list_id,
+        rank=rank_between(last_rank(db, card.list_id), None),
         user_id=current_user.id
     )
+    if rank_too_long(new_card.rank):
+        background_tasks.add_task(rebalance_list, card.list_id)
 
     db.add(new_card)
+    version = touch_board(db, board.id)
+    new_card.row_version = version
+    # Con vencimiento pasado cuenta como vencida en esa semana
+    invalidate_report_snapshots(db, board.id, [new_card.due_date])
     db.commit()
     db.refresh(new_card)
 
+    publish_board_event(board.id, version, "card.created", event_data(CardResponse, new_card))
+
     return new_card
 
 
+# ---------------------------------------------------------
+# POST /cards/bulk → Altas, ediciones, movimientos y bajas en lote
+# ---------------------------------------------------------
+@router.post("/bulk", response_model=CardBulkResponse)
+def bulk_cards(
+    payload: CardBulkRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aplica una lista de operaciones (create / update / move / delete)
+    en una única transacción. La propiedad de los tableros se comprueba
+    una vez por tablero y cada operación devuelve su propio resultado.
+    Se publica un evento "cards.bulk" por tablero modificado.
+    """
+    outcome = apply_bulk_operations(db, current_user, payload)
+
+    for board_id, (version, changes) in outcome.events.items():
+        publish_board_event(board_id, version, "cards.bulk", changes)
+
+    for list_id in outcome.rebalance_lists:
+        background_tasks.add_task(rebalance_list, list_id)
+
+    return {"applied": outcome.applied, "results": outcome.results}
+
+
 # ---------------------------------------------------------
 # GET /cards?board_id=...
 # ---------------------------------------------------------
 @router.get("/", response_model=list[dict])
 def list_cards(
     board_id: int,
+    request: Request,
+    response: Response,
     responsible_id: int | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -99,123 +167,59 @@ def list_cards(
     if not board:
         raise HTTPException(status_code=403)
 
-    # -----------------------------------------------------
-    #  Obtener tarjetas + total de horas (agregación por tarjeta)
-    # -----------------------------------------------------
-    cards_query = (
-        db.query(
-            Card,
-            func.coalesce(func.sum(WorkLog.hours), 0).label("total_hours")
-        )
-        .outerjoin(WorkLog, WorkLog.card_id == Card.id)
-        .filter(Card.board_id == board_id)
-        .group_by(Card.id)
-        .order_by(Card.list_id)
-    )
-    # Filtro opcional por responsable
-    if responsible_id is not None:
-        cards_query = cards_query.filter(Card.user_id == responsible_id)
-
-    cards_with_hours = cards_query.all()
-
-    # Usamos los IDs para traer etiquetas y subtareas en bloque
-    card_ids = [card.id for card, _total in cards_with_hours]
-    labels_by_card: dict[int, list[dict]] = {}
-    subtasks_by_card: dict[int, dict] = {}
-
-    if card_ids:
-        labels = db.query(Label).filter(Label.card_id.in_(card_ids)).all()
-        for lbl in labels:
-            labels_by_card.setdefault(lbl.card_id, []).append({
-                "id": lbl.id,
-                "card_id": lbl.card_id,
-                "name": lbl.name,
-                "color": lbl.color,
-            })
-
-        subtasks = db.query(Subtask).filter(Subtask.card_id.in_(card_ids)).all()
-        for st in subtasks:
-            entry = subtasks_by_card.setdefault(st.card_id, {"total": 0, "completed": 0})
-            entry["total"] += 1
-            if st.completed:
-                entry["completed"] += 1
-
-    # -----------------------------------------------------
-    # Convertir a JSON incluyendo total_hours
-    # -----------------------------------------------------
-    result = []
-
-    for card, total_hours in cards_with_hours:
-        subtask_summary = subtasks_by_card.get(card.id, {"total": 0, "completed": 0})
-        result.append({
-            "id": card.id,
-            "title": card.title,
-            "description": card.description,
-            "due_date": card.due_date,
-            "board_id": card.board_id,
-            "list_id": card.list_id,
-            "user_id": card.user_id,
-            "created_at": card.created_at,
-            "updated_at": card.updated_at,
-            "total_hours": float(total_hours),  
-            "labels": labels_by_card.get(card.id, []),
-            "subtasks_total": subtask_summary["total"],
-            "subtasks_completed": subtask_summary["completed"],
-        })
-
-    return result
+    # Si el cliente ya tiene esta versión del tablero → 304
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
+    return build_card_payloads(db, board_id, responsible_id)
 
 
 # ---------------------------------------------------------
 # GET /cards/search?query=...
 # ---------------------------------------------------------
-@router.get("/search", response_model=list[dict])
+@router.get("/search", response_model=dict)
 def search_cards(
     query: str,
-    board_id: int,
+    board_id: int | None = None,
     responsible_id: int | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    board = db.query(Board).filter(
-        Board.id == board_id,
-        Board.user_id == current_user.id
-    ).first()
-
-    if not board:
-        raise HTTPException(status_code=403)
-
-    # Base query limitada al board del usuario autenticado
-    cards_query = db.query(Card).filter(Card.board_id == board_id)
-
-    if responsible_id is not None:
-        cards_query = cards_query.filter(Card.user_id == responsible_id)
+    """
+    Búsqueda de texto completo en título y descripción.
+    Sin board_id busca en todos los tableros del usuario.
+    Devuelve {"items": [...], "next_cursor": ...}; cada resultado
+    lleva su puntuación y los fragmentos resaltados con <mark>.
+    """
+    if board_id is not None:
+        board = db.query(Board).filter(
+            Board.id == board_id,
+            Board.user_id == current_user.id
+        ).first()
 
-    # Búsqueda por coincidencia parcial en título o descripción
-    like_query = f"%{query}%"
-    cards = (
-        cards_query
-        .filter(
-            (Card.title.ilike(like_query)) | (Card.description.ilike(like_query))
+        if not board:
+            raise HTTPException(status_code=403)
+
+    if not query.strip():
+        return {"items": [], "next_cursor": None}
+
+    try:
+        items, next_cursor = run_card_search(
+            db,
+            current_user.id,
+            query.strip(),
+            board_id=board_id,
+            responsible_id=responsible_id,
+            limit=limit,
+            cursor=cursor,
         )
-        .order_by(Card.list_id)
-        .all()
-    )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
 
-    return [
-        {
-            "id": card.id,
-            "title": card.title,
-            "description": card.description,
-            "due_date": card.due_date,
-            "board_id": card.board_id,
-            "list_id": card.list_id,
-            "user_id": card.user_id,
-            "created_at": card.created_at,
-            "updated_at": card.updated_at,
-        }
-        for card in cards
-    ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 def _get_card_or_404(card_id: int, db: Session) -> Card:
@@ -239,12 +243,17 @@ def _assert_card_owner(card: Card, current_user: User):
 def update_card(
     card_id: int,
     card_update: CardUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     card = _get_card_or_404(card_id, db)
     _assert_card_owner(card, current_user)
 
+    # Informes guardados de las semanas en las que aparece (antes y después)
+    invalidate_card_snapshots(db, [card.id])
+    invalidate_report_snapshots(db, card.board_id, [card_update.due_date])
+
     if card_update.title is not None:
         if not card_update.title.strip():
             raise HTTPException(status_code=400)
@@ -265,11 +274,103 @@ def update_card(
         if not list_obj:
             raise HTTPException(status_code=400)
 
+        # Cambio de lista sin posición: al final de la lista destino
+        if card_update.list_id != card.list_id:
+            card.rank = rank_between(last_rank(db, card_update.list_id, card.id), None)
+            if rank_too_long(card.rank):
+                background_tasks.add_task(rebalance_list, card_update.list_id)
+
         card.list_id = card_update.list_id
 
+    version = touch_board(db, card.board_id)
+    card.row_version = version
     db.commit()
     db.refresh(card)
 
+    publish_board_event(card.board_id, version, "card.updated", event_data(CardResponse, card))
+
+    return card
+
+
+# ---------------------------------------------------------
+# POST /cards/{id}/move → Mover tarjeta (arrastrar y soltar)
+# ---------------------------------------------------------
+@router.post("/{card_id}/move", response_model=CardResponse)
+def move_card(
+    card_id: int,
+    move: CardMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Coloca la tarjeta en `list_id` entre `prev_id` y `next_id`.
+    Solo se escribe la fila de la tarjeta: su nueva clave de orden
+    cae entre las de sus vecinas, sin renumerar el resto.
+    """
+    card = _get_card_or_404(card_id, db)
+    _assert_card_owner(card, current_user)
+
+    list_obj = db.query(List).filter(
+        List.id == move.list_id,
+        List.board_id == card.board_id
+    ).first()
+
+    if not list_obj:
+        raise HTTPException(status_code=400, detail="La lista no pertenece al tablero.")
+
+    # Claves de las vecinas indicadas (deben estar en la lista destino)
+    neighbour_ids = [i for i in (move.prev_id, move.next_id) if i is not None]
+    if card.id in neighbour_ids:
+        raise HTTPException(status_code=400, detail="Una tarjeta no puede ser su propia vecina.")
+
+    neighbour_ranks = dict(
+        db.query(Card.id, Card.rank)
+        .filter(Card.id.in_(neighbour_ids), Card.list_id == move.list_id)
+        .all()
+    ) if neighbour_ids else {}
+
+    if len(neighbour_ranks) != len(set(neighbour_ids)):
+        raise HTTPException(status_code=400, detail="Las tarjetas vecinas no están en la lista destino.")
+
+    if move.prev_id is not None and move.next_id is not None:
+        before, after = neighbour_ranks[move.prev_id], neighbour_ranks[move.next_id]
+    elif move.prev_id is not None:
+        before = neighbour_ranks[move.prev_id]
+        after = rank_after(db, move.list_id, before, card.id)
+    elif move.next_id is not None:
+        after = neighbour_ranks[move.next_id]
+        before = rank_before(db, move.list_id, after, card.id)
+    elif move.order is not None:
+        before, after = ranks_around_position(db, move.list_id, move.order, card.id)
+    else:
+        before, after = last_rank(db, move.list_id, card.id), None
+
+    try:
+        new_rank = rank_between(before, after)
+    except ValueError:
+        # Vecinas desordenadas o claves empatadas (p. ej. tarjetas antiguas
+        # sin clave): se reequilibra la lista y el cliente reintenta
+        return JSONResponse(
+            status_code=409,
+            content={"detail": "No hay hueco entre esas tarjetas; recarga la lista y reintenta."},
+            background=BackgroundTask(rebalance_list, move.list_id),
+        )
+
+    # Cambia updated_at: puede salir de las completadas de su semana
+    invalidate_card_snapshots(db, [card.id])
+    card.list_id = move.list_id
+    card.rank = new_rank
+    version = touch_board(db, card.board_id)
+    card.row_version = version
+    db.commit()
+    db.refresh(card)
+
+    if rank_too_long(new_rank):
+        background_tasks.add_task(rebalance_list, move.list_id)
+
+    publish_board_event(card.board_id, version, "card.moved", event_data(CardResponse, card))
+
     return card
 
 
@@ -285,9 +386,18 @@ def delete_card(
     card = _get_card_or_404(card_id, db)
     _assert_card_owner(card, current_user)
 
+    board_id = card.board_id
+    invalidate_card_snapshots(db, [card.id])
+    delete_card_rollups(db, [card.id])
     db.delete(card)
+    version = touch_board(db, board_id)
+    # Sus etiquetas, subtareas y worklogs se borran con ella:
+    # basta con la marca de la tarjeta
+    record_tombstone(db, board_id, "card", card_id, version)
     db.commit()
 
+    publish_board_event(board_id, version, "card.deleted", {"id": card_id})
+
     return {"message": "Tarjeta eliminada correctamente."}
 
 
@@ -306,8 +416,13 @@ def create_label(
 
     label = Label(card_id=card.id, name=payload.name, color=payload.color)
     db.add(label)
+    version = touch_board(db, card.board_id)
+    label.row_version = version
+    mark_card_changed(db, card.id, version)
     db.commit()
     db.refresh(label)
+
+    publish_board_event(card.board_id, version, "label.created", event_data(LabelOut, label))
     return label
 
 
@@ -332,8 +447,14 @@ def delete_label(
     if not label:
         raise HTTPException(status_code=404)
     _assert_card_owner(label.card, current_user)
+    board_id, card_id = label.card.board_id, label.card_id
     db.delete(label)
+    version = touch_board(db, board_id)
+    record_tombstone(db, board_id, "label", label_id, version, card_id=card_id)
+    mark_card_changed(db, card_id, version)
     db.commit()
+
+    publish_board_event(board_id, version, "label.deleted", {"id": label_id, "card_id": card_id})
     return {"message": "Etiqueta eliminada correctamente."}
 
 
@@ -352,8 +473,13 @@ def create_subtask(
 
     subtask = Subtask(card_id=card.id, title=payload.title, completed=False)
     db.add(subtask)
+    version = touch_board(db, card.board_id)
+    subtask.row_version = version
+    mark_card_changed(db, card.id, version, subtasks=1)
     db.commit()
     db.refresh(subtask)
+
+    publish_board_event(card.board_id, version, "subtask.created", event_data(SubtaskOut, subtask))
     return subtask
 
 
@@ -380,11 +506,21 @@ def update_subtask(
         raise HTTPException(status_code=404)
     _assert_card_owner(subtask.card, current_user)
 
+    was_completed = subtask.completed
     for field, value in payload.dict(exclude_unset=True).items():
         setattr(subtask, field, value)
 
+    board_id = subtask.card.board_id
+    version = touch_board(db, board_id)
+    subtask.row_version = version
+    mark_card_changed(
+        db, subtask.card_id, version,
+        subtasks_completed=int(subtask.completed) - int(was_completed),
+    )
     db.commit()
     db.refresh(subtask)
+
+    publish_board_event(board_id, version, "subtask.updated", event_data(SubtaskOut, subtask))
     return subtask
 
 
@@ -398,6 +534,13 @@ def delete_subtask(
     if not subtask:
         raise HTTPException(status_code=404)
     _assert_card_owner(subtask.card, current_user)
+    board_id, card_id = subtask.card.board_id, subtask.card_id
+    completed = subtask.completed
     db.delete(subtask)
+    version = touch_board(db, board_id)
+    record_tombstone(db, board_id, "subtask", subtask_id, version, card_id=card_id)
+    mark_card_changed(db, card_id, version, subtasks=-1, subtasks_completed=-int(completed))
     db.commit()
+
+    publish_board_event(board_id, version, "subtask.deleted", {"id": subtask_id, "card_id": card_id})
     return {"message": "Subtarea eliminada correctamente."}
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -28,8 +28,66 @@ class CardUpdate(BaseModel):
 # MOVER tarjeta
 # -------------------------------------------------------
 class CardMove(BaseModel):
+    """
+    Destino de la tarjeta: lista y hueco entre dos vecinas.
+    - prev_id: tarjeta que quedará justo encima
+    - next_id: tarjeta que quedará justo debajo
+    - order: posición (0 = primera) si no se indican vecinas
+    Sin ninguno de los tres, la tarjeta va al final de la lista.
+    """
     list_id: int
-    order: int = Field(..., ge=0)
+    prev_id: Optional[int] = None
+    next_id: Optional[int] = None
+    order: Optional[int] = Field(None, ge=0)
+
+
+# -------------------------------------------------------
+# OPERACIONES EN LOTE (POST /cards/bulk)
+# -------------------------------------------------------
+class BulkCardCreate(CardCreate):
+    op: Literal["create"]
+
+
+class BulkCardUpdate(CardUpdate):
+    op: Literal["update"]
+    card_id: int
+
+
+class BulkCardMove(BaseModel):
+    # Al final de la lista destino, en el orden de las operaciones
+    op: Literal["move"]
+    card_id: int
+    list_id: int
+
+
+class BulkCardDelete(BaseModel):
+    op: Literal["delete"]
+    card_id: int
+
+
+BulkCardOperation = Annotated[
+    Union[BulkCardCreate, BulkCardUpdate, BulkCardMove, BulkCardDelete],
+    Field(discriminator="op"),
+]
+
+
+class CardBulkRequest(BaseModel):
+    operations: list[BulkCardOperation] = Field(..., min_length=1, max_length=500)
+    # atomic: si alguna operación no es válida no se aplica ninguna
+    atomic: bool = True
+
+
+class BulkCardResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["ok", "error", "skipped"]
+    card_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class CardBulkResponse(BaseModel):
+    applied: bool
+    results: list[BulkCardResult]
 
 
 # -------------------------------------------------------
@@ -42,6 +100,7 @@ class CardResponse(BaseModel):
     due_date: Optional[date]
     board_id: int
     list_id: int
+    rank: str
     user_id: Optional[int]
     created_at: datetime
     updated_at: datetime
@@ -0,0 +1,216 @@
+import base64
+import html
+import json
+import re
+from typing import Optional
+
+from sqlalchemy import DDL, Float, and_, cast, column, event, func, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from backend.cards.models import Card
+from backend.models import Board
+
+
+# =========================================================
+# ÍNDICE DE BÚSQUEDA DE TARJETAS
+# =========================================================
+# PostgreSQL: índice GIN sobre la misma expresión to_tsvector que usa
+# la consulta (sin columna extra: el planificador casa la expresión).
+# SQLite: tabla virtual FTS5 de contenido externo, mantenida por
+# triggers sobre `cards`.
+# Ambos se crean junto con la tabla `cards` (create_all) y, en bases
+# de datos ya existentes, con las migraciones.
+
+SEARCH_CONFIG = "'spanish'::regconfig"
+
+PG_DOCUMENT = (
+    f"to_tsvector({SEARCH_CONFIG}, "
+    "coalesce(cards.title, '') || ' ' || coalesce(cards.description, ''))"
+)
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_cards_search ON cards USING GIN ("
+    f"to_tsvector({SEARCH_CONFIG}, coalesce(title, '') || ' ' || coalesce(description, '')))",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5("
+    "title, description, content='cards', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN "
+    "INSERT INTO cards_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN "
+    "INSERT INTO cards_fts(cards_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    # Solo si cambia el texto: mover o reordenar no reindexa
+    "CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE OF title, description ON cards BEGIN "
+    "INSERT INTO cards_fts(cards_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO cards_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    # Indexa las tarjetas que ya existieran
+    "INSERT INTO cards_fts(cards_fts) VALUES ('rebuild')",
+]
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Card.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Card.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+# Tabla virtual FTS5 (solo SQLite) para usarla en consultas
+cards_fts = table("cards_fts", column("rowid"))
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# La base de datos marca las coincidencias con caracteres de uso
+# privado; el texto se escapa como HTML en Python y solo después se
+# cambian por <mark>: el título/descripción nunca llega como marcado.
+_SENTINEL_START = "\ue000"
+_SENTINEL_STOP = "\ue001"
+
+
+def _highlight_html(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return (
+        html.escape(text)
+        .replace(_SENTINEL_START, HIGHLIGHT_START)
+        .replace(_SENTINEL_STOP, HIGHLIGHT_STOP)
+    )
+
+
+# ---------------------------------------------------------
+# Cursor opaco: (puntuación, id) de la última fila devuelta
+# ---------------------------------------------------------
+def encode_cursor(score: float, card_id: int) -> str:
+    raw = json.dumps({"s": score, "id": card_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(data["s"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Cursor inválido")
+
+
+def _fts5_query(text: str) -> Optional[str]:
+    # Cada palabra como término literal con prefijo: la entrada del
+    # usuario nunca se interpreta como sintaxis de FTS5
+    tokens = re.findall(r"\w+", text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+# ---------------------------------------------------------
+# Búsqueda
+# ---------------------------------------------------------
+def search_cards(
+    db: Session,
+    user_id: int,
+    text: str,
+    board_id: Optional[int] = None,
+    responsible_id: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Tarjetas de los tableros del usuario que casan con `text`,
+    ordenadas por relevancia (score desc, id desc) y paginadas por
+    cursor. Devuelve (resultados, siguiente cursor o None).
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(literal_column(SEARCH_CONFIG), text)
+        document = literal_column(PG_DOCUMENT)
+        # double precision: el cursor compara la puntuación exacta
+        score = cast(func.ts_rank_cd(document, query), Float)
+        options = f"StartSel={_SENTINEL_START}, StopSel={_SENTINEL_STOP}, HighlightAll=true"
+        title_hl = func.ts_headline(
+            literal_column(SEARCH_CONFIG), func.coalesce(Card.title, ""), query, options
+        )
+        description_hl = func.ts_headline(
+            literal_column(SEARCH_CONFIG),
+            func.coalesce(Card.description, ""),
+            query,
+            f"StartSel={_SENTINEL_START}, StopSel={_SENTINEL_STOP}, MaxFragments=2",
+        )
+        stmt = select(Card, score.label("score"), title_hl, description_hl).where(
+            document.op("@@")(query)
+        )
+
+    elif dialect == "sqlite":
+        match = _fts5_query(text)
+        if match is None:
+            return [], None
+        fts = literal_column("cards_fts")
+        # bm25: menor es mejor → lo invertimos para ordenar igual que en PG
+        score = -func.bm25(fts)
+        stmt = (
+            select(
+                Card,
+                score.label("score"),
+                func.highlight(fts, 0, _SENTINEL_START, _SENTINEL_STOP),
+                func.snippet(fts, 1, _SENTINEL_START, _SENTINEL_STOP, "…", 16),
+            )
+            .select_from(cards_fts)
+            .join(Card, Card.id == cards_fts.c.rowid)
+            .where(fts.op("MATCH")(match))
+        )
+
+    else:
+        # Otros motores: coincidencia parcial sin ranking
+        like = f"%{text}%"
+        score = literal_column("0.0")
+        stmt = select(Card, score.label("score"), Card.title, Card.description).where(
+            or_(Card.title.ilike(like), Card.description.ilike(like))
+        )
+
+    # Solo tableros del usuario (uno concreto o todos)
+    stmt = stmt.join(Board, Board.id == Card.board_id).where(Board.user_id == user_id)
+    if board_id is not None:
+        stmt = stmt.where(Card.board_id == board_id)
+    if responsible_id is not None:
+        stmt = stmt.where(Card.user_id == responsible_id)
+
+    if cursor is not None:
+        last_score, last_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            score < last_score,
+            and_(score == last_score, Card.id < last_id),
+        ))
+
+    # Una fila de más para saber si hay página siguiente
+    rows = db.execute(stmt.order_by(score.desc(), Card.id.desc()).limit(limit + 1)).all()
+
+    results = []
+    for card, card_score, title_hl, description_hl in rows[:limit]:
+        results.append({
+            "id": card.id,
+            "title": card.title,
+            "description": card.description,
+            "due_date": card.due_date,
+            "board_id": card.board_id,
+            "list_id": card.list_id,
+            "user_id": card.user_id,
+            "created_at": card.created_at,
+            "updated_at": card.updated_at,
+            "score": float(card_score),
+            "highlights": {
+                "title": _highlight_html(title_hl),
+                "description": _highlight_html(description_hl or None),
+            },
+        })
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["score"], last["id"])
+
+    return results, next_cursor
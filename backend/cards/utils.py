@@ -0,0 +1,79 @@
+from sqlalchemy.orm import Session
+
+from backend.cards.models import Card, Label
+
+
+# ---------------------------------------------------------
+# Tarjetas de un tablero con horas, etiquetas y subtareas
+# ---------------------------------------------------------
+def build_card_payloads(
+    db: Session,
+    board_id: int,
+    responsible_id: int | None = None,
+) -> list[dict]:
+    """
+    Devuelve las tarjetas del tablero como dicts JSON con:
+    - total_hours
+    - labels
+    - subtasks_total / subtasks_completed
+
+    Los totales son columnas de la propia tarjeta (mantenidas al
+    escribir), así que son 2 consultas: tarjetas y etiquetas.
+    """
+
+    cards_query = (
+        db.query(Card)
+        .filter(Card.board_id == board_id)
+        .order_by(Card.list_id, Card.rank, Card.id)
+    )
+    # Filtro opcional por responsable
+    if responsible_id is not None:
+        cards_query = cards_query.filter(Card.user_id == responsible_id)
+
+    cards = cards_query.all()
+
+    # Etiquetas del tablero en bloque (join por board_id: usa los índices
+    # y evita un IN con miles de ids en tableros grandes)
+    labels_by_card: dict[int, list[dict]] = {}
+
+    if cards:
+        labels_query = (
+            db.query(Label)
+            .join(Card, Card.id == Label.card_id)
+            .filter(Card.board_id == board_id)
+        )
+        if responsible_id is not None:
+            labels_query = labels_query.filter(Card.user_id == responsible_id)
+
+        for lbl in labels_query.all():
+            labels_by_card.setdefault(lbl.card_id, []).append({
+                "id": lbl.id,
+                "card_id": lbl.card_id,
+                "name": lbl.name,
+                "color": lbl.color,
+            })
+
+    # -----------------------------------------------------
+    # Convertir a JSON
+    # -----------------------------------------------------
+    result = []
+
+    for card in cards:
+        result.append({
+            "id": card.id,
+            "title": card.title,
+            "description": card.description,
+            "due_date": card.due_date,
+            "board_id": card.board_id,
+            "list_id": card.list_id,
+            "rank": card.rank,
+            "user_id": card.user_id,
+            "created_at": card.created_at,
+            "updated_at": card.updated_at,
+            "total_hours": float(card.total_hours),
+            "labels": labels_by_card.get(card.id, []),
+            "subtasks_total": card.subtasks_total,
+            "subtasks_completed": card.subtasks_completed,
+        })
+
+    return result
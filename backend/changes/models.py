@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+# ============================================================
+# Modelo Tombstone
+# Rastro de un registro borrado, para la sincronización delta
+# ============================================================
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+
+    # "card" | "label" | "subtask" | "worklog"
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    card_id = Column(Integer, nullable=True)
+
+    # Versión del tablero en la que se borró
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_tombstones_board_version", "board_id", "version"),
+    )
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from backend.database import get_db
+from backend.auth.utils import get_current_user
+from backend.cards.models import Card, Label, Subtask
+from backend.cards.schemas import CardResponse, LabelOut, SubtaskOut
+from backend.events.utils import event_data
+from backend.models import Board, User
+from backend.worklogs.models import WorkLog
+from backend.worklogs.schemas import WorkLogOut
+
+from .models import Tombstone
+
+router = APIRouter(
+    prefix="/boards",
+    tags=["changes"]
+)
+
+
+def _rows(schema, rows) -> list[dict]:
+    return [{**event_data(schema, row), "row_version": row.row_version} for row in rows]
+
+
+# ---------------------------------------------------------
+# GET /boards/{board_id}/changes?since=<cursor>
+# ---------------------------------------------------------
+@router.get("/{board_id}/changes")
+def board_changes(
+    board_id: int,
+    since: int = Query(0, ge=0, description="Cursor devuelto por la llamada anterior (0 = todo)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cambios del tablero posteriores al cursor `since`:
+    tarjetas, etiquetas, subtareas y worklogs creados o modificados,
+    y los borrados (tombstones). El nuevo cursor es la versión actual
+    del tablero.
+
+    Cualquier cambio en un hijo marca también su tarjeta, así que solo
+    se buscan hijos de las tarjetas cambiadas: el coste depende del
+    tamaño del cambio, no del tablero.
+
+    El cliente aplica primero `deleted` y después el resto: un id
+    borrado puede reaparecer en una fila nueva (p. ej. SQLite reutiliza
+    ids), y en ese caso viene en las dos listas.
+    """
+    board = db.query(Board).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not board:
+        raise HTTPException(status_code=403)
+
+    result = {
+        "board_id": board.id,
+        "cursor": board.version,
+        "cards": [],
+        "labels": [],
+        "subtasks": [],
+        "worklogs": [],
+        "deleted": [],
+    }
+
+    if since >= board.version:
+        return result
+
+    cards = (
+        db.query(Card)
+        .filter(Card.board_id == board_id, Card.row_version > since)
+        .order_by(Card.id)
+        .all()
+    )
+    card_ids = [card.id for card in cards]
+    result["cards"] = _rows(CardResponse, cards)
+
+    if card_ids:
+        for key, model, schema in (
+            ("labels", Label, LabelOut),
+            ("subtasks", Subtask, SubtaskOut),
+            ("worklogs", WorkLog, WorkLogOut),
+        ):
+            rows = (
+                db.query(model)
+                .filter(model.card_id.in_(card_ids), model.row_version > since)
+                .order_by(model.id)
+                .all()
+            )
+            result[key] = _rows(schema, rows)
+
+    tombstones = (
+        db.query(Tombstone)
+        .filter(Tombstone.board_id == board_id, Tombstone.version > since)
+        .order_by(Tombstone.version)
+        .all()
+    )
+    result["deleted"] = [
+        {
+            "entity": t.entity,
+            "id": t.entity_id,
+            "card_id": t.card_id,
+            "version": t.version,
+        }
+        for t in tombstones
+    ]
+
+    return result
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.cards.models import Card
+
+from .models import Tombstone
+
+
+# =========================================================
+# MARCAS DE CAMBIO PARA LA SINCRONIZACIÓN DELTA
+# =========================================================
+def mark_card_changed(
+    db: Session,
+    card_id: int,
+    version: int,
+    hours: float = 0,
+    subtasks: int = 0,
+    subtasks_completed: int = 0,
+) -> None:
+    """
+    Marca la tarjeta como cambiada en `version` cuando cambia algo
+    que cuelga de ella (etiqueta, subtarea, worklog).
+    No toca updated_at: no es una edición de la tarjeta y los
+    informes semanales dependen de esa fecha.
+
+    hours / subtasks / subtasks_completed: incrementos de los contadores
+    de la tarjeta, aplicados en el mismo UPDATE (x = x + delta).
+    """
+    values = {"row_version": version, "updated_at": Card.updated_at}
+    if hours:
+        values["total_hours"] = Card.total_hours + hours
+    if subtasks:
+        values["subtasks_total"] = Card.subtasks_total + subtasks
+    if subtasks_completed:
+        values["subtasks_completed"] = Card.subtasks_completed + subtasks_completed
+
+    db.execute(
+        update(Card)
+        .where(Card.id == card_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_tombstone(
+    db: Session,
+    board_id: int,
+    entity: str,
+    entity_id: int,
+    version: int,
+    card_id: Optional[int] = None,
+) -> None:
+    # Los borrados son físicos: dejamos constancia para los clientes
+    db.add(Tombstone(
+        board_id=board_id,
+        entity=entity,
+        entity_id=entity_id,
+        card_id=card_id,
+        version=version,
+    ))
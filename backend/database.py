@@ -1,15 +1,163 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+from . import metrics
+from .instrumentation import install_query_hooks
+
+
+# =========================================================
+# ESTADÍSTICAS DEL POOL DE CONEXIONES
+# =========================================================
+class PoolStats:
+    """
+    Contadores de uso del pool: checkouts, esperas y timeouts.
+    Sirven para dimensionar pool_size / max_overflow frente al
+    número de workers de uvicorn.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    # Todos los contadores se modifican con el lock: los eventos del pool
+    # llegan desde varios hilos a la vez
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+
+    def as_dict(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "wait_avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "overflow": pool.overflow(),
+                "checked_in": pool.checkedin(),
+            })
+        return data
+
+
+def _instrumented_pool(pool_class, stats: PoolStats):
+    # Subclase del pool que mide cuánto se espera por una conexión libre
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                stats.record_timeout()
+                raise
+            finally:
+                stats.record_wait((time.perf_counter() - start) * 1000)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def _listen_pool_events(sync_engine, stats: PoolStats) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.record_connect()
 
-from .config import DATABASE_URL
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.record_checkout()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.record_checkin()
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidation()
+
+
+def _engine_options(url: str, pool_class, stats: PoolStats, is_async: bool) -> dict:
+    options = {"echo": settings.db_echo}
+
+    # SQLite usa su propio pool (un fichero local): no se configura
+    if url.startswith("sqlite"):
+        return options
+
+    options.update({
+        "poolclass": _instrumented_pool(pool_class, stats),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    })
+
+    if settings.db_statement_timeout_ms and url.startswith("postgresql"):
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    return options
 
 
 # Crea el motor de conexión a PostgreSQL
+# (echo desactivado salvo NEOCARE_DB_ECHO=1 / debug)
+pool_stats = PoolStats()
 engine = create_engine(
-    DATABASE_URL,
-    echo=True,       # Muestra las consultas SQL en la consola (útil para aprender). Pon False si molesta.
-    future=True,
+    settings.database_url,
+    **_engine_options(settings.database_url, QueuePool, pool_stats, is_async=False),
 )
+_listen_pool_events(engine, pool_stats)
+install_query_hooks(engine)
 
 # Crea la fábrica de sesiones
 SessionLocal = sessionmaker(
@@ -18,6 +166,38 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Motor y sesiones asíncronas (solo en modo NEOCARE_ASYNC_DB=1).
+# expire_on_commit=False: tras el commit los objetos se serializan fuera
+# de la sesión y no pueden recargarse de forma perezosa.
+async_pool_stats = PoolStats()
+if settings.async_db:
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **_engine_options(
+            settings.async_database_url, AsyncAdaptedQueuePool, async_pool_stats, is_async=True
+        ),
+    )
+    _listen_pool_events(async_engine.sync_engine, async_pool_stats)
+    install_query_hooks(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+def _pool_metrics() -> dict:
+    data = {"sync": pool_stats.as_dict(engine.pool)}
+    if async_engine is not None:
+        data["async"] = async_pool_stats.as_dict(async_engine.sync_engine.pool)
+    return data
+
+
+metrics.register("db_pool", _pool_metrics)
+
 # Clase base para los modelos (tablas)
 Base = declarative_base()
 
@@ -29,3 +209,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Versión asíncrona de get_db
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("El modo asíncrono no está activo (NEOCARE_ASYNC_DB=1)")
+    async with AsyncSessionLocal() as db:
+        yield db
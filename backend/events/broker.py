@@ -0,0 +1,170 @@
+import asyncio
+import importlib
+import json
+import threading
+from typing import Optional
+
+from ..config import settings
+from .. import metrics
+
+
+# =========================================================
+# SUSCRIPCIÓN A UN TABLERO
+# =========================================================
+class Subscription:
+    """
+    Cola de eventos de un cliente conectado al feed de un tablero.
+    Si el cliente no consume a tiempo y la cola se llena, se marca
+    como desbordada: el cliente debe volver a descargar el tablero.
+    """
+
+    def __init__(self, board_id: int, maxsize: int):
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _put(self, event: dict) -> None:
+        # Siempre se ejecuta en el event loop del suscriptor
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def deliver(self, event: dict) -> None:
+        # Seguro desde cualquier hilo (handlers síncronos del threadpool)
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# =========================================================
+# BROKER EN MEMORIA (un solo proceso)
+# =========================================================
+class InMemoryBroker:
+    """
+    Reparte los eventos entre los suscriptores del propio proceso.
+    Suficiente para un despliegue de un solo worker.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, board_id: int) -> Subscription:
+        subscription = Subscription(board_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.board_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.board_id]
+
+    def dispatch(self, event: dict) -> None:
+        # Entrega local a los suscriptores del tablero del evento
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["board_id"], ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def publish(self, event: dict) -> None:
+        self.published += 1
+        self.dispatch(event)
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "boards": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+            }
+
+
+# =========================================================
+# BROKER REDIS (varios workers / nodos)
+# =========================================================
+class RedisBroker(InMemoryBroker):
+    """
+    Publica en un canal Redis y reparte localmente lo que llega del
+    canal, de modo que todos los workers ven los eventos de todos.
+    Requiere el paquete `redis`.
+    """
+
+    channel = "neocare:board-events"
+
+    def __init__(self, queue_size: int, url: str):
+        super().__init__(queue_size)
+        import redis
+
+        self.url = url
+        self._publisher = redis.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, board_id: int) -> Subscription:
+        subscription = super().subscribe(board_id)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return subscription
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.dispatch(json.loads(message["data"]))
+        finally:
+            await pubsub.close()
+            await client.close()
+
+    def publish(self, event: dict) -> None:
+        self.published += 1
+        self._publisher.publish(self.channel, json.dumps(event))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+        self._publisher.close()
+
+
+def _create_broker() -> InMemoryBroker:
+    """
+    NEOCARE_EVENTS_BACKEND:
+    - "memory" (por defecto)
+    - "redis" (usa NEOCARE_EVENTS_REDIS_URL)
+    - "paquete.modulo:Clase" para un backend propio
+    """
+    backend = settings.events_backend
+    if backend == "memory":
+        return InMemoryBroker(settings.events_queue_size)
+    if backend == "redis":
+        return RedisBroker(settings.events_queue_size, settings.events_redis_url)
+
+    module_name, _, class_name = backend.partition(":")
+    broker_class = getattr(importlib.import_module(module_name), class_name)
+    return broker_class(settings.events_queue_size)
+
+
+broker = _create_broker()
+
+metrics.register("board_events", broker.stats)
@@ -0,0 +1,109 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import get_async_db, get_db
+from backend.auth.utils import get_current_user_stream, get_current_user_stream_async
+from backend.models import Board, User
+
+from .broker import broker
+
+router = APIRouter(
+    prefix="/boards",
+    tags=["events"]
+)
+
+
+def _board_version_query(board_id: int, user_id: int):
+    return select(Board.version).where(Board.id == board_id, Board.user_id == user_id)
+
+
+def _board_version_or_403(
+    board_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_stream),
+) -> int:
+    version = db.execute(_board_version_query(board_id, current_user.id)).scalar()
+
+    # Liberar la conexión ya: el stream puede durar horas
+    db.close()
+
+    if version is None:
+        raise HTTPException(status_code=403)
+    return version
+
+
+async def _board_version_or_403_async(
+    board_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_stream_async),
+) -> int:
+    # Versión con AsyncSession (modo NEOCARE_ASYNC_DB=1)
+    version = (await db.execute(_board_version_query(board_id, current_user.id))).scalar()
+
+    await db.close()
+
+    if version is None:
+        raise HTTPException(status_code=403)
+    return version
+
+
+# El endpoint ya es async (asyncify_router no lo toca): la dependencia
+# se elige aquí según el modo
+_board_version = _board_version_or_403_async if settings.async_db else _board_version_or_403
+
+
+def _sse(event_type: str, payload: dict, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(payload)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# ---------------------------------------------------------
+# GET /boards/{board_id}/events → Server-Sent Events
+# ---------------------------------------------------------
+# Emite un evento por cada cambio del tablero (card.*, label.*,
+# subtask.*, worklog.*). El campo "version" permite al cliente saber
+# si se ha perdido algo; ante "resync" debe recargar el tablero.
+@router.get("/{board_id}/events")
+async def board_events(
+    board_id: int,
+    request: Request,
+    version: int = Depends(_board_version),
+):
+    subscription = broker.subscribe(board_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            yield _sse("hello", {"board_id": board_id, "version": version}, version)
+
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.events_keepalive)
+
+                if subscription.overflowed:
+                    yield _sse("resync", {"board_id": board_id})
+                    break
+
+                if event is None:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield _sse(event["type"], event, event["version"])
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
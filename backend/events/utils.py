@@ -0,0 +1,34 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from .broker import broker
+
+
+# =========================================================
+# PUBLICACIÓN DE CAMBIOS DE UN TABLERO
+# =========================================================
+def publish_board_event(
+    board_id: int,
+    version: int,
+    event_type: str,
+    data: Optional[dict] = None,
+) -> None:
+    """
+    Envía un evento a los clientes conectados al feed del tablero.
+    Llamar DESPUÉS del commit: un cambio revertido no debe notificarse.
+
+    event_type: "<entidad>.<acción>", p. ej. "card.updated", "worklog.deleted"
+    version: versión del tablero tras el cambio (devuelta por touch_board)
+    """
+    broker.publish({
+        "board_id": board_id,
+        "version": version,
+        "type": event_type,
+        "data": data or {},
+    })
+
+
+def event_data(schema: type[BaseModel], obj: Any) -> dict:
+    # Serializa un objeto ORM con su schema de respuesta (JSON puro)
+    return schema.model_validate(obj, from_attributes=True).model_dump(mode="json")
@@ -0,0 +1,172 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+from . import metrics
+
+
+logger = logging.getLogger("neocare.sql")
+
+
+# =========================================================
+# NORMALIZACIÓN DE SENTENCIAS
+# =========================================================
+# Dos sentencias tienen la misma "forma" si solo cambian los
+# parámetros. Se unifican los placeholders de cada driver y las
+# listas de IN (...) de longitud variable.
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|\$\d+|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    shape = _SPACES_RE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    return _IN_LIST_RE.sub("(?)", shape)
+
+
+# =========================================================
+# CONTADORES POR PETICIÓN
+# =========================================================
+class RequestQueryStats:
+    """
+    Sentencias SQL emitidas durante una petición HTTP:
+    número, tiempo acumulado y repeticiones por forma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+
+    def repeated(self) -> list[tuple[str, int]]:
+        # Formas repetidas en la misma petición (posible N+1)
+        threshold = settings.sql_repeat_threshold
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+# Totales del proceso (GET /metrics/)
+_totals = {"requests": 0, "queries": 0, "db_ms": 0.0, "flagged_requests": 0}
+_totals_lock = threading.Lock()
+
+
+def _sql_metrics() -> dict:
+    with _totals_lock:
+        data = dict(_totals)
+    data["db_ms"] = round(data["db_ms"], 3)
+    return data
+
+
+metrics.register("sql", _sql_metrics)
+
+
+# =========================================================
+# HOOKS DEL ENGINE
+# =========================================================
+def install_query_hooks(sync_engine) -> None:
+    """
+    Cronometra cada sentencia ejecutada por el engine y la asigna
+    a la petición en curso (si la hay).
+    """
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - start) * 1000)
+
+
+# =========================================================
+# MIDDLEWARE
+# =========================================================
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que abre unos contadores por petición y los publica:
+    - cabecera Server-Timing (db y app) para el navegador
+    - log estructurado en "neocare.sql" (WARNING si hay formas repetidas)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", '
+                    f"app;dur={app_ms:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, status_code, stats, (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _report(scope, status_code, stats: RequestQueryStats, total_ms: float) -> None:
+        repeated = stats.repeated()
+
+        with _totals_lock:
+            _totals["requests"] += 1
+            _totals["queries"] += stats.count
+            _totals["db_ms"] += stats.total_ms
+            if repeated:
+                _totals["flagged_requests"] += 1
+
+        record = {
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.total_ms, 3),
+            "total_ms": round(total_ms, 3),
+        }
+        if repeated:
+            record["repeated"] = [
+                {"statement": shape[:200], "count": n} for shape, n in repeated
+            ]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from backend.database import get_db
 from backend.auth.utils import get_current_user
-from backend.models import List, User
+from backend.boards.utils import not_modified_response
+from backend.models import Board, List, User
 
 router = APIRouter(
     prefix="/lists",
@@ -14,9 +15,23 @@ router = APIRouter(
 @router.get("/")
 def list_lists(
     board_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    board = db.query(Board).filter(
+        Board.id == board_id,
+        Board.user_id == current_user.id
+    ).first()
+
+    if not board:
+        raise HTTPException(status_code=403)
+
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
     lists = (
         db.query(List)
         .filter(List.board_id == board_id)
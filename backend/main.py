@@ -1,11 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import get_db, engine, Base
+from .config import settings
+from .database import get_db, engine
 from . import models
+from .migrations.runner import check_schema_version, upgrade
+from .async_mode import asyncify_router
+from .instrumentation import QueryStatsMiddleware
+from .auth.utils import get_current_user, get_current_user_async
+from .auth.passwords import password_pool
 
 from .auth.routes import router as auth_router
 from .boards.routes import router as boards_router
@@ -13,11 +21,34 @@ from backend.cards.routes import router as cards_router, extras_router as cards_
 from backend.worklogs.routes import router as worklogs_router
 from backend.lists.routes import router as lists_router
 from backend.reportsweek.routes import router as reports_router
+from backend.metrics.routes import router as metrics_router
+from backend.events.routes import router as events_router
+from backend.changes.routes import router as changes_router
+from backend.events.broker import broker
+
+# =========================================================
+# Ciclo de vida: arranque y parada del proceso
+# =========================================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El esquema lo crean/actualizan las migraciones (python -m backend.migrations
+    # upgrade); al arrancar solo se comprueba la versión (una consulta).
+    # NEOCARE_AUTO_MIGRATE=1 aplica las pendientes (desarrollo local).
+    if settings.auto_migrate:
+        upgrade(engine)
+    else:
+        check_schema_version(engine)
+
+    yield
+    # Parar los procesos de bcrypt y el broker de eventos al apagar el worker
+    password_pool.shutdown()
+    await broker.close()
+
 
 # =========================================================
 # Crear aplicación FastAPI
 # =========================================================
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 # =========================================================
@@ -36,23 +67,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Contador de SQL por petición (Server-Timing + log "neocare.sql")
+app.add_middleware(QueryStatsMiddleware)
+
 
-# =========================================================
-# Crear tablas en BD (solo si no existen)
-# =========================================================
-Base.metadata.create_all(bind=engine)
 
 
 # =========================================================
 # Registrar routers (endpoints principales + extras)
 # =========================================================
-app.include_router(auth_router)
-app.include_router(boards_router)
-app.include_router(cards_router)
-app.include_router(cards_extras_router)
-app.include_router(worklogs_router)
-app.include_router(lists_router)
-app.include_router(reports_router)
+# En modo asíncrono (NEOCARE_ASYNC_DB=1) cada router se sirve con
+# AsyncSession; así se pueden comparar ambos modos con la misma API.
+routers = [
+    auth_router,
+    boards_router,
+    cards_router,
+    cards_extras_router,
+    worklogs_router,
+    lists_router,
+    reports_router,
+    metrics_router,
+    events_router,
+    changes_router,
+]
+
+for router in routers:
+    app.include_router(asyncify_router(router) if settings.async_db else router)
+
+if settings.async_db:
+    app.dependency_overrides[get_current_user] = get_current_user_async
 
 # =========================================================
 # Endpoint de test de conexión
@@ -0,0 +1,23 @@
+import os
+from typing import Callable
+
+
+# =========================================================
+# REGISTRO DE MÉTRICAS DEL PROCESO
+# =========================================================
+# Cada módulo registra una función que devuelve un dict con sus
+# contadores; GET /metrics/ las agrupa por nombre.
+# Los valores son por proceso (uno por worker de uvicorn).
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    _providers[name] = provider
+
+
+def snapshot() -> dict:
+    data = {"pid": os.getpid()}
+    for name, provider in _providers.items():
+        data[name] = provider()
+    return data
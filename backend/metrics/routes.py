@@ -0,0 +1,40 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from backend.config import settings
+
+from . import snapshot
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+
+def _check_metrics_token(authorization: Optional[str]) -> None:
+    # Sin NEOCARE_METRICS_TOKEN el endpoint está desactivado
+    if not settings.metrics_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), settings.metrics_token.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# ---------------------------------------------------------
+# GET /metrics/ → Contadores internos del proceso
+# ---------------------------------------------------------
+# Expone el pid, el estado del pool y la caché de autenticación:
+# solo con el token de NEOCARE_METRICS_TOKEN
+@router.get("/", include_in_schema=False)
+def read_metrics(authorization: Optional[str] = Header(None)):
+    _check_metrics_token(authorization)
+    return snapshot()
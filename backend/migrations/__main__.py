@@ -0,0 +1,43 @@
+"""
+Migraciones del esquema.
+
+Uso:
+    python -m backend.migrations upgrade [--target N]
+    python -m backend.migrations status
+
+Ejecutar `upgrade` en cada despliegue, antes de arrancar los workers:
+al arrancar solo se comprueba que la versión del esquema es la esperada.
+"""
+
+import argparse
+import logging
+import sys
+
+from ..database import engine
+from .runner import current_version, pending_migrations, upgrade
+from .steps import LATEST_VERSION
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Migraciones del esquema")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser("upgrade", help="Aplicar las migraciones pendientes")
+    upgrade_parser.add_argument("--target", type=int, default=None)
+    subparsers.add_parser("status", help="Versión actual y migraciones pendientes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "status":
+        print(f"Versión del esquema: {current_version(engine)} (código: {LATEST_VERSION})")
+        for migration in pending_migrations(engine):
+            print(f"  pendiente {migration.version}: {migration.description}")
+        return 0
+
+    applied = upgrade(engine, args.target)
+    print(f"Migraciones aplicadas: {applied or 'ninguna'}; versión actual {current_version(engine)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
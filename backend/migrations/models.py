@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+# ============================================================
+# Modelo SchemaMigration
+# Una fila por migración aplicada (ver migrations/steps.py)
+# ============================================================
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(200), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
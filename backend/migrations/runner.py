@@ -0,0 +1,109 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .models import SchemaMigration
+from .steps import LATEST_VERSION, MIGRATIONS
+
+
+logger = logging.getLogger("neocare.migrations")
+
+# Clave del advisory lock de PostgreSQL: un solo proceso migrando a la vez
+_ADVISORY_LOCK_KEY = 7349021
+
+
+class SchemaOutdated(RuntimeError):
+    """La BD no tiene aplicadas todas las migraciones del código."""
+
+
+# =========================================================
+# VERSIÓN DEL ESQUEMA
+# =========================================================
+def current_version(engine: Engine) -> int:
+    """
+    Última migración aplicada (0 si la BD no tiene tabla de versiones).
+    Una sola consulta: es lo único que se hace al arrancar un worker.
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return 0
+
+
+def check_schema_version(engine: Engine) -> int:
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        raise SchemaOutdated(
+            f"Esquema en versión {version}, el código necesita la {LATEST_VERSION}. "
+            "Ejecuta: python -m backend.migrations upgrade"
+        )
+    if version > LATEST_VERSION:
+        # Despliegue escalonado: la BD ya tiene migraciones de código más nuevo
+        logger.warning("Esquema en versión %s, más nueva que el código (%s)", version, LATEST_VERSION)
+    return version
+
+
+# =========================================================
+# APLICAR MIGRACIONES
+# =========================================================
+def pending_migrations(engine: Engine):
+    version = current_version(engine)
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> list[int]:
+    """
+    Aplica en orden las migraciones pendientes (hasta `target`).
+    Cada paso se registra en schema_migrations al terminar; si uno
+    falla, los anteriores quedan aplicados y el siguiente intento
+    retoma desde ahí. Devuelve las versiones aplicadas.
+    """
+    applied = []
+
+    with engine.connect() as lock_conn:
+        if engine.dialect.name == "postgresql":
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+
+        try:
+            # La tabla de versiones se crea antes que nada
+            with engine.begin() as conn:
+                if not inspect(conn).has_table(SchemaMigration.__tablename__):
+                    SchemaMigration.__table__.create(bind=conn)
+
+            for migration in pending_migrations(engine):
+                if target is not None and migration.version > target:
+                    break
+
+                logger.info("Aplicando migración %s: %s", migration.version, migration.description)
+
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        migration.apply(conn)
+                        _record(conn, migration)
+                else:
+                    with engine.connect() as raw:
+                        conn = raw.execution_options(isolation_level="AUTOCOMMIT")
+                        migration.apply(conn)
+                    with engine.begin() as conn:
+                        _record(conn, migration)
+
+                applied.append(migration.version)
+        finally:
+            if engine.dialect.name == "postgresql":
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+                lock_conn.commit()
+
+    return applied
+
+
+def _record(conn, migration) -> None:
+    conn.execute(
+        SchemaMigration.__table__.insert().values(
+            version=migration.version,
+            description=migration.description,
+        )
+    )
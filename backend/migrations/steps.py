@@ -0,0 +1,198 @@
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import bindparam, inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from ..database import Base
+from .. import models
+from ..cards import models as cards_models
+from ..cards import search as cards_search
+from ..cards.counters import repair_card_counters
+from ..cards.ranking import evenly_spaced_ranks
+from ..changes import models as changes_models  # noqa: F401  (registra la tabla)
+from ..reportsweek import models as reports_models
+from ..worklogs import models as worklogs_models
+from ..worklogs.rollup import expected_rollups
+from . import models as migrations_models  # noqa: F401
+
+
+# =========================================================
+# PASOS DE MIGRACIÓN
+# =========================================================
+# Reglas para añadir un paso:
+# - versión nueva al final de MIGRATIONS (nunca reordenar ni editar
+#   un paso ya publicado);
+# - idempotente: comprobar antes de crear/alterar, para que repetir un
+#   paso a medio aplicar no falle;
+# - online: columnas con DEFAULT constante (sin reescribir la tabla en
+#   PostgreSQL 11+) e índices con CREATE INDEX CONCURRENTLY, que no
+#   bloquea escrituras y exige transactional=False.
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+    # False: se ejecuta en autocommit (CREATE INDEX CONCURRENTLY)
+    transactional: bool = True
+
+
+# ---------------------------------------------------------
+# Utilidades
+# ---------------------------------------------------------
+def _column_names(conn: Connection, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _index_names(conn: Connection, table: str) -> set[str]:
+    return {index["name"] for index in inspect(conn).get_indexes(table)}
+
+
+def _add_missing_columns(conn: Connection, model, names: list[str]) -> None:
+    # ALTER TABLE ... ADD COLUMN con la definición del modelo
+    table = model.__table__
+    existing = _column_names(conn, table.name)
+    preparer = conn.dialect.identifier_preparer
+    for name in names:
+        if name in existing:
+            continue
+        column_ddl = CreateColumn(table.c[name]).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"))
+
+
+def _drop_invalid_index(conn: Connection, name: str) -> None:
+    # Un CREATE INDEX CONCURRENTLY interrumpido deja un índice inválido:
+    # se borra para poder repetir el paso
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).scalar()
+    if invalid:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def _create_index(conn: Connection, index) -> None:
+    ddl = str(CreateIndex(index).compile(dialect=conn.dialect))
+    if conn.dialect.name == "postgresql":
+        _drop_invalid_index(conn, index.name)
+        ddl = re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX CONCURRENTLY IF NOT EXISTS ", ddl)
+    conn.execute(text(ddl))
+
+
+# ---------------------------------------------------------
+# 1. Esquema base
+# ---------------------------------------------------------
+def _baseline(conn: Connection) -> None:
+    """
+    Crea las tablas que falten. En una BD nueva deja el esquema completo
+    (los pasos siguientes no tendrán nada que hacer); en una BD creada
+    antes de las migraciones solo añade las tablas nuevas.
+    """
+    Base.metadata.create_all(bind=conn)
+
+
+# ---------------------------------------------------------
+# 2. Columnas de versión, orden y contadores
+# ---------------------------------------------------------
+def _versioning_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, models.Board, ["version"])
+    _add_missing_columns(conn, cards_models.Card, [
+        "rank", "row_version", "total_hours", "subtasks_total", "subtasks_completed",
+    ])
+    _add_missing_columns(conn, cards_models.Label, ["row_version"])
+    _add_missing_columns(conn, cards_models.Subtask, ["row_version"])
+    _add_missing_columns(conn, worklogs_models.WorkLog, ["row_version"])
+
+    _backfill_ranks(conn)
+
+    # Contadores a partir de worklogs y subtareas
+    with Session(bind=conn) as db:
+        repair_card_counters(db)
+
+
+def _backfill_ranks(conn: Connection) -> None:
+    # Tarjetas anteriores a las claves de orden: por id dentro de su lista
+    Card = cards_models.Card
+    list_ids = conn.execute(
+        select(Card.list_id).where(Card.rank == "").distinct()
+    ).scalars().all()
+
+    cards = Card.__table__
+    for list_id in list_ids:
+        card_ids = conn.execute(
+            select(Card.id).where(Card.list_id == list_id).order_by(Card.rank, Card.id)
+        ).scalars().all()
+        ranks = evenly_spaced_ranks(len(card_ids))
+        conn.execute(
+            update(cards)
+            .where(cards.c.id == bindparam("_card_id"))
+            .values(rank=bindparam("_rank"), updated_at=cards.c.updated_at),
+            [{"_card_id": card_id, "_rank": rank} for card_id, rank in zip(card_ids, ranks)],
+        )
+
+
+# ---------------------------------------------------------
+# 3. Índice de búsqueda de tarjetas
+# ---------------------------------------------------------
+def _search_index(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        _drop_invalid_index(conn, "ix_cards_search")
+        for statement in cards_search.POSTGRES_SEARCH_DDL:
+            conn.execute(text(statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+    elif conn.dialect.name == "sqlite":
+        for statement in cards_search.SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+
+
+# ---------------------------------------------------------
+# 4. Índices de los modelos
+# ---------------------------------------------------------
+def _model_indexes(conn: Connection) -> None:
+    """
+    Crea los índices declarados en los modelos que falten (uno a uno,
+    CONCURRENTLY en PostgreSQL). Los que ya existan no se tocan.
+    """
+    for table in Base.metadata.sorted_tables:
+        existing = _index_names(conn, table.name)
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                _create_index(conn, index)
+
+
+# ---------------------------------------------------------
+# 5. Snapshots de informes de semanas cerradas
+# ---------------------------------------------------------
+def _report_snapshots(conn: Connection) -> None:
+    reports_models.ReportSnapshot.__table__.create(bind=conn, checkfirst=True)
+
+
+# ---------------------------------------------------------
+# 6. Horas agregadas por tarjeta, usuario y día
+# ---------------------------------------------------------
+def _worklog_daily(conn: Connection) -> None:
+    daily = worklogs_models.WorkLogDaily.__table__
+    daily.create(bind=conn, checkfirst=True)
+
+    # Carga inicial desde los worklogs existentes (un INSERT ... SELECT)
+    if conn.execute(select(daily.c.card_id).limit(1)).first() is None:
+        expected = expected_rollups().subquery()
+        conn.execute(daily.insert().from_select(
+            [column.name for column in expected.c], select(expected)
+        ))
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "Esquema base", _baseline),
+    Migration(2, "Versiones de fila, orden de tarjetas y contadores", _versioning_columns),
+    Migration(3, "Índice de búsqueda de tarjetas", _search_index, transactional=False),
+    Migration(4, "Índices compuestos de los filtros frecuentes", _model_indexes, transactional=False),
+    Migration(5, "Snapshots de informes de semanas cerradas", _report_snapshots),
+    Migration(6, "Horas agregadas por tarjeta, usuario y día", _worklog_daily),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
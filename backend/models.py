@@ -1,5 +1,5 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -28,11 +28,20 @@ class Board(Base):
     name = Column(String, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
+    # Versión del contenido: sube con cada cambio en listas, tarjetas,
+    # etiquetas, subtareas u horas (se usa para los ETag)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relaciones ORM para enlazar con usuario, listas y tarjetas
     owner = relationship("User", back_populates="boards")
     lists = relationship("List", back_populates="board")
     cards = relationship("Card", back_populates="board")
 
+    # Casi todas las consultas filtran por el dueño del tablero
+    __table_args__ = (
+        Index("ix_boards_user_id", "user_id"),
+    )
+
 
 
 class List(Base):
@@ -46,3 +55,7 @@ class List(Base):
     # Relaciones ORM para enlazar con tablero y tarjetas
     board = relationship("Board", back_populates="lists")
     cards = relationship("Card", back_populates="list")
+
+    __table_args__ = (
+        Index("ix_lists_board_order", "board_id", "order"),
+    )
@@ -0,0 +1,299 @@
+"""
+Comprobación de planes de consulta de los endpoints.
+
+Uso:
+    python -m backend.query_plans [--database-url URL] [--cards 2000] [--other-boards 50]
+
+Crea el esquema en una base de datos de pruebas (por defecto un SQLite
+temporal), la llena con datos sintéticos, llama a los endpoints
+principales con TestClient, captura cada sentencia SQL que ejecutan y
+la pasa por EXPLAIN. Termina con código 1 si alguna recorre una tabla
+entera en lugar de usar un índice.
+
+- SQLite: EXPLAIN QUERY PLAN; cuenta como recorrido completo "SCAN <tabla>".
+- PostgreSQL: EXPLAIN con enable_seqscan=off; cuenta cualquier "Seq Scan"
+  (con los recorridos secuenciales penalizados, solo aparecen si no hay
+  un índice utilizable).
+
+¡No usar contra una base de datos real! Se crean y se borran tablas.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+
+
+# Sentencias que no se analizan (DDL, transacciones, introspección)
+_SKIPPED_PREFIXES = ("CREATE", "DROP", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "INSERT")
+
+
+def _configure_environment(database_url: str) -> None:
+    # Debe hacerse antes de importar backend.*: el motor se crea al importar
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["NEOCARE_ASYNC_DB"] = "0"
+    os.environ["NEOCARE_BCRYPT_WORKERS"] = "0"
+    os.environ.setdefault("NEOCARE_DB_ECHO", "0")
+
+
+def _seed(db, cards_per_board: int, other_boards: int) -> dict:
+    """
+    Datos sintéticos: un usuario principal con `cards_per_board` tarjetas
+    y `other_boards` usuarios más con tableros menores, para que las
+    tablas pequeñas (listas, etiquetas...) tengan un tamaño realista.
+    Etiquetas, subtareas y worklogs repartidos en varias semanas.
+    Inserciones en bloque (Core); worklog_daily se calcula al final.
+    """
+    from sqlalchemy import insert
+
+    from backend import models
+    from backend.auth.passwords import pwd_context
+    from backend.boards.utils import provision_default_boards
+    from backend.cards.models import Card, Label, Subtask
+    from backend.cards.ranking import evenly_spaced_ranks
+    from backend.worklogs.models import WorkLog
+    from backend.worklogs.rollup import repair_worklog_rollups
+
+    password_hash = pwd_context.hash("query-plans")
+    user_ids = db.execute(
+        insert(models.User).returning(models.User.id, sort_by_parameter_order=True),
+        [
+            {"email": f"plans{n}@example.com", "password_hash": password_hash}
+            for n in range(other_boards + 1)
+        ],
+    ).scalars().all()
+    boards = provision_default_boards(db, user_ids)
+
+    lists_by_board: dict[int, list[int]] = {}
+    for lst in db.query(models.List).order_by(models.List.board_id, models.List.order):
+        lists_by_board.setdefault(lst.board_id, []).append(lst.id)
+
+    today = datetime.date.today()
+    card_ids_by_board: dict[int, list[int]] = {}
+
+    for n, user_id in enumerate(user_ids):
+        board_id = boards[user_id]
+        list_ids = lists_by_board[board_id]
+        count = cards_per_board if n == 0 else max(cards_per_board // 4, 1)
+        ranks = evenly_spaced_ranks(count)
+
+        card_ids = db.execute(
+            insert(Card).returning(Card.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": f"Tarjeta {i} revisión",
+                    "description": f"Descripción de la tarjeta número {i}",
+                    "due_date": today + datetime.timedelta(days=i % 60 - 30),
+                    "board_id": board_id,
+                    "list_id": list_ids[i % len(list_ids)],
+                    "rank": ranks[i],
+                    "user_id": user_id,
+                }
+                for i in range(count)
+            ],
+        ).scalars().all()
+        card_ids_by_board[board_id] = card_ids
+
+        db.execute(insert(Label), [
+            {"card_id": card_id, "name": "urgente", "color": "red"} for card_id in card_ids[::3]
+        ])
+        db.execute(insert(Subtask), [
+            {"card_id": card_id, "title": f"paso {k}", "completed": k == 0}
+            for card_id in card_ids[::2] for k in range(2)
+        ])
+        db.execute(insert(WorkLog), [
+            {
+                "card_id": card_id,
+                "user_id": user_id,
+                "date": today - datetime.timedelta(days=(i * 7 + k) % 90),
+                "hours": 1.5,
+            }
+            for i, card_id in enumerate(card_ids) for k in range(3)
+        ])
+
+    db.commit()
+
+    # Las inserciones directas no pasan por los handlers: se calcula
+    # worklog_daily a partir de los worklogs
+    repair_worklog_rollups(db)
+
+    board_id = boards[user_ids[0]]
+    return {
+        "user_id": user_ids[0],
+        "board_id": board_id,
+        "list_ids": lists_by_board[board_id],
+        "card_ids": card_ids_by_board[board_id],
+    }
+
+
+def _exercise_endpoints(client, headers: dict, seed: dict) -> None:
+    # Peticiones representativas de cada endpoint (lecturas y escrituras)
+    board_id = seed["board_id"]
+    card_id = seed["card_ids"][10]
+    list_ids = seed["list_ids"]
+    year, week, _ = datetime.date.today().isocalendar()
+    week_param = f"{year}-{week:02d}"
+    # Semana cerrada: la primera petición guarda el snapshot, la segunda lo lee
+    year, week, _ = (datetime.date.today() - datetime.timedelta(days=7)).isocalendar()
+    closed_week = f"{year}-{week:02d}"
+
+    requests = [
+        ("GET", "/boards/", None),
+        ("GET", f"/boards/{board_id}/lists", None),
+        ("GET", f"/boards/{board_id}/full", None),
+        ("GET", f"/lists/?board_id={board_id}", None),
+        ("GET", f"/cards/?board_id={board_id}", None),
+        ("GET", f"/cards/search?query=revision&board_id={board_id}", None),
+        ("GET", "/cards/search?query=revision", None),
+        ("GET", f"/cards/{card_id}/labels", None),
+        ("GET", f"/cards/{card_id}/subtasks", None),
+        ("GET", f"/cards/{card_id}/worklogs", None),
+        ("GET", f"/boards/{board_id}/changes?since=0", None),
+        ("GET", f"/users/me/worklogs?week={week_param}", None),
+        ("GET", f"/users/me/worklogs/summary?week={week_param}", None),
+        ("GET", f"/report/{board_id}/summary?week={week_param}", None),
+        ("GET", f"/report/{board_id}/summary?week={week_param}&detail=counts", None),
+        ("GET", f"/report/{board_id}/hours-by-user?week={week_param}", None),
+        ("GET", f"/report/{board_id}/hours-by-card?week={week_param}", None),
+        ("GET", f"/report/{board_id}/hours-by-user?week={closed_week}", None),
+        ("GET", f"/report/{board_id}/hours-by-user?week={closed_week}", None),
+        ("GET", f"/report/{board_id}/trend?from={closed_week}&to={week_param}", None),
+        ("GET", f"/report/portfolio?week={week_param}&by_board=true", None),
+        ("GET", f"/report/{board_id}/export/worklogs?from={datetime.date.today() - datetime.timedelta(days=30)}&to={datetime.date.today()}", None),
+        ("GET", f"/report/{board_id}/export/hours-daily?from={datetime.date.today() - datetime.timedelta(days=30)}&to={datetime.date.today()}&format=ndjson", None),
+        ("PATCH", f"/cards/{card_id}", {"title": "Tarjeta editada", "list_id": list_ids[1]}),
+        ("POST", f"/cards/{card_id}/move", {"list_id": list_ids[0], "order": 5}),
+        ("POST", f"/cards/{card_id}/labels", {"name": "nueva", "color": "blue"}),
+        ("POST", f"/cards/{card_id}/subtasks", {"title": "otra"}),
+        ("POST", f"/cards/{card_id}/worklogs", {"date": str(datetime.date.today()), "hours": 2}),
+        ("POST", "/cards/bulk", {"operations": [
+            {"op": "move", "card_id": seed["card_ids"][20], "list_id": list_ids[2]},
+            {"op": "delete", "card_id": seed["card_ids"][21]},
+        ]}),
+        ("DELETE", f"/cards/{seed['card_ids'][30]}", None),
+    ]
+
+    for method, path, body in requests:
+        response = client.request(method, path, headers=headers, json=body)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path} → {response.status_code}: {response.text[:200]}")
+
+    # Importación de horas (multipart, no JSON)
+    timesheet = "card_id,user,date,hours,note\n" + "".join(
+        f"{card},,{datetime.date.today()},1.5,\n" for card in seed["card_ids"][40:60]
+    )
+    response = client.post("/worklogs/import", headers=headers, files={"file": ("horas.csv", timesheet)})
+    if response.status_code >= 400 or not response.json()["applied"]:
+        raise RuntimeError(f"POST /worklogs/import → {response.status_code}: {response.text[:200]}")
+
+
+def _full_scans(connection, dialect: str, statement: str, parameters) -> list[str]:
+    cursor = connection.cursor()
+    try:
+        if dialect == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            details = [row[-1] for row in cursor.fetchall()]
+            return [
+                detail for detail in details
+                if detail.startswith("SCAN ")
+                and "VIRTUAL TABLE" not in detail
+                and "CONSTANT ROW" not in detail
+            ]
+
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        found = []
+
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                found.append(f"Seq Scan on {node.get('Relation Name')}")
+            for child in node.get("Plans", []):
+                walk(child)
+
+        walk(plan[0]["Plan"])
+        return found
+    finally:
+        cursor.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN de las consultas de los endpoints")
+    parser.add_argument("--database-url", default=None, help="BD de pruebas (por defecto SQLite temporal)")
+    parser.add_argument("--cards", type=int, default=2000, help="Tarjetas del tablero principal")
+    parser.add_argument("--other-boards", type=int, default=50, help="Tableros de otros usuarios")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar también los planes correctos")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{tmpdir.name}/query_plans.db"
+    _configure_environment(database_url)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from backend.auth.utils import create_access_token
+    from backend.database import Base, SessionLocal, engine
+    from backend.main import app
+    from backend.migrations.runner import upgrade
+
+    # Esquema creado por las migraciones, igual que en un despliegue
+    Base.metadata.drop_all(bind=engine)
+    upgrade(engine)
+
+    with SessionLocal() as db:
+        seed = _seed(db, args.cards, args.other_boards)
+
+    # Estadísticas para el planificador, como en una BD en uso
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+    captured: dict[str, object] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if executemany or statement.lstrip().upper().startswith(_SKIPPED_PREFIXES):
+            return
+        captured.setdefault(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        token = create_access_token({"sub": str(seed["user_id"])})
+        with TestClient(app) as client:
+            _exercise_endpoints(client, {"Authorization": f"Bearer {token}"}, seed)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    failures = 0
+    raw = engine.raw_connection()
+    try:
+        for statement, parameters in captured.items():
+            scans = _full_scans(raw, engine.dialect.name, statement, parameters)
+            one_line = " ".join(statement.split())
+            if len(one_line) > 400:
+                one_line = one_line[:400] + " …"
+            if scans:
+                failures += 1
+                print(f"FULL SCAN  {', '.join(scans)}\n    {one_line}\n")
+            elif args.verbose:
+                print(f"ok         {one_line}\n")
+        raw.rollback()
+    finally:
+        raw.close()
+        Base.metadata.drop_all(bind=engine)
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    print(f"{len(captured)} sentencias analizadas, {failures} con recorrido completo")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
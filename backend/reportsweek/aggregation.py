@@ -0,0 +1,217 @@
+from datetime import date
+
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.models import List
+from backend.cards.models import Card
+from backend.worklogs.models import WorkLog, WorkLogDaily
+
+
+# =========================================================
+# AGREGACIÓN DE HORAS DE LOS INFORMES SEMANALES
+# =========================================================
+# Por defecto se recorren los worklogs de la semana en bloques
+# (yield_per) con la misma consulta que la versión con pandas y se
+# agregan en Python: la memoria depende del nº de grupos, no del de
+# worklogs, y la salida es idéntica byte a byte:
+# - mismo orden de filas (misma consulta, sin ORDER BY) y misma suma
+#   compensada (Kahan) que groupby().sum()
+# - hours-by-user: ordenado por user_id
+# - hours-by-card: grupos ordenados por clave y después por horas
+#   descendente con el mismo argsort que sort_values (mismos empates);
+#   las tarjetas sin responsable no aparecen (groupby descarta claves
+#   nulas) y, si había alguna, responsible_id sale como float
+#
+# Con NEOCARE_REPORT_AGGREGATION=sql se lee en su lugar la tabla
+# worklog_daily (ver worklogs/rollup.py) con GROUP BY: no se recorren
+# los worklogs, pero los totales pueden diferir en la última cifra
+# (27.6 frente a 27.599999999999998) y los empates salen por card_id.
+
+# Filas por bloque al recorrer los worklogs
+STREAM_BATCH_SIZE = 1000
+
+
+class _KahanSum:
+    """
+    Suma compensada (Kahan), el mismo algoritmo que el groupby().sum()
+    de pandas: sumando en el mismo orden da el mismo float.
+    """
+
+    __slots__ = ("total", "compensation")
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value: float) -> None:
+        y = value - self.compensation
+        t = self.total + y
+        self.compensation = t - self.total - y
+        self.total = t
+
+
+def _week_rollups(board_id: int, start_date: date, end_date: date) -> tuple:
+    # Filas de worklog_daily del tablero en la semana
+    return (
+        WorkLogDaily.board_id == board_id,
+        WorkLogDaily.date >= start_date,
+        WorkLogDaily.date < end_date,
+    )
+
+
+def _stream(db: Session, query):
+    return db.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+
+
+def _descending_order(totals: list[float]) -> list[int]:
+    """
+    Índices de `totals` de mayor a menor, con los empates en el mismo
+    orden que sort_values(ascending=False) de pandas (nargsort).
+    """
+    # numpy solo se importa al ordenar (no al arrancar)
+    import numpy as np
+
+    indexes = np.arange(len(totals))[::-1]
+    values = np.asarray(totals, dtype=np.float64)[::-1]
+    return indexes[values.argsort(kind="quicksort")][::-1].tolist()
+
+
+# ---------------------------------------------------------
+# Horas por usuario
+# ---------------------------------------------------------
+def hours_by_user(db: Session, board_id: int, start_date: date, end_date: date) -> list[dict]:
+    """
+    Por usuario: total de horas y nº de tarjetas distintas.
+    """
+    if settings.report_aggregation == "sql":
+        return [
+            {
+                "user_id": row.user_id,
+                "total_hours": row.total_hours,
+                "tasks_count": row.tasks_count,
+            }
+            for row in db.execute(hours_by_user_query(board_id, start_date, end_date))
+        ]
+
+    # Misma consulta que la versión con pandas
+    query = (
+        select(WorkLog.user_id, WorkLog.card_id, WorkLog.hours)
+        .join(Card, WorkLog.card_id == Card.id)
+        .where(
+            Card.board_id == board_id,
+            WorkLog.date >= start_date,
+            WorkLog.date < end_date,
+        )
+    )
+
+    hours: dict[int, _KahanSum] = {}
+    cards: dict[int, set[int]] = {}
+    for user_id, card_id, value in _stream(db, query):
+        hours.setdefault(user_id, _KahanSum()).add(value)
+        cards.setdefault(user_id, set()).add(card_id)
+
+    return [
+        {
+            "user_id": user_id,
+            "total_hours": hours[user_id].total,
+            "tasks_count": len(cards[user_id]),
+        }
+        for user_id in sorted(hours)
+    ]
+
+
+def hours_by_user_query(board_id: int, start_date: date, end_date: date):
+    # SELECT sobre worklog_daily
+    return (
+        select(
+            WorkLogDaily.user_id,
+            func.sum(WorkLogDaily.hours).label("total_hours"),
+            func.count(distinct(WorkLogDaily.card_id)).label("tasks_count"),
+        )
+        .where(*_week_rollups(board_id, start_date, end_date))
+        .group_by(WorkLogDaily.user_id)
+        .order_by(WorkLogDaily.user_id)
+    )
+
+
+# ---------------------------------------------------------
+# Horas por tarjeta
+# ---------------------------------------------------------
+def hours_by_card(db: Session, board_id: int, start_date: date, end_date: date) -> list[dict]:
+    """
+    Por tarjeta: título, responsable, estado (lista) y total de horas.
+    """
+    if settings.report_aggregation == "sql":
+        return [
+            {
+                "card_id": row.card_id,
+                "title": row.title,
+                "responsible_id": row.responsible_id,
+                "status": row.status,
+                "total_hours": row.total_hours,
+            }
+            for row in db.execute(hours_by_card_query(board_id, start_date, end_date))
+        ]
+
+    # Misma consulta que la versión con pandas (sin filtrar responsables:
+    # cambiaría el plan y con él el orden de las filas)
+    query = (
+        select(
+            Card.id.label("card_id"),
+            Card.title,
+            Card.user_id.label("responsible_id"),
+            List.name.label("status"),
+            WorkLog.hours,
+        )
+        .join(WorkLog, WorkLog.card_id == Card.id)
+        .join(List, Card.list_id == List.id)
+        .where(
+            Card.board_id == board_id,
+            WorkLog.date >= start_date,
+            WorkLog.date < end_date,
+        )
+    )
+
+    groups: dict[tuple, _KahanSum] = {}
+    for card_id, title, responsible_id, status, value in _stream(db, query):
+        key = (card_id, title, responsible_id, status)
+        groups.setdefault(key, _KahanSum()).add(value)
+
+    # pandas pasaba la columna a float si algún responsable era nulo
+    as_float = any(key[2] is None for key in groups)
+    keys = sorted(key for key in groups if key[2] is not None)
+    totals = [groups[key].total for key in keys]
+
+    result = []
+    for index in _descending_order(totals):
+        card_id, title, responsible_id, status = keys[index]
+        result.append({
+            "card_id": card_id,
+            "title": title,
+            "responsible_id": float(responsible_id) if as_float else responsible_id,
+            "status": status,
+            "total_hours": totals[index],
+        })
+    return result
+
+
+def hours_by_card_query(board_id: int, start_date: date, end_date: date):
+    # SELECT sobre worklog_daily
+    total_hours = func.sum(WorkLogDaily.hours).label("total_hours")
+    return (
+        select(
+            Card.id.label("card_id"),
+            Card.title,
+            Card.user_id.label("responsible_id"),
+            List.name.label("status"),
+            total_hours,
+        )
+        .select_from(WorkLogDaily)
+        .join(Card, WorkLogDaily.card_id == Card.id)
+        .join(List, Card.list_id == List.id)
+        .where(*_week_rollups(board_id, start_date, end_date), Card.user_id.is_not(None))
+        .group_by(Card.id, Card.title, Card.user_id, List.name)
+        .order_by(total_hours.desc(), Card.id)
+    )
@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from backend.config import settings
+from backend.database import SessionLocal
+from backend.cards.models import Card
+from backend.worklogs.models import WorkLog, WorkLogDaily
+
+from .aggregation import hours_by_card, hours_by_card_query, hours_by_user, hours_by_user_query
+
+
+# =========================================================
+# EXPORTACIÓN EN STREAMING (CSV / NDJSON / PARQUET)
+# =========================================================
+# Las filas se leen con un cursor de servidor (yield_per, que activa
+# stream_results) en bloques de EXPORT_BATCH_SIZE y cada bloque se
+# escribe y se envía antes de leer el siguiente: la memoria no depende
+# del nº de filas.
+#
+# El generador abre su propia sesión: la de la petición (get_db) solo
+# sirve para comprobar permisos y se cierra antes de empezar a enviar.
+# Es síncrono, así que Starlette lo recorre en el threadpool también
+# en modo asíncrono.
+
+# Filas por bloque leído / escrito (un row group en Parquet)
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class Dataset(NamedTuple):
+    # (nombre, tipo) de cada columna; tipo: int | float | str | date | datetime
+    columns: tuple
+    query: Callable
+    row: Callable
+    # Informe equivalente (aggregation.py): si la agregación configurada
+    # no es "sql" se exporta su resultado en lugar de `query`
+    report: Optional[Callable] = None
+
+
+# ---------------------------------------------------------
+# Conjuntos de datos exportables
+# ---------------------------------------------------------
+def _worklogs_query(board_id: int, start_date: date, end_date: date):
+    return (
+        select(
+            WorkLog.id,
+            WorkLog.date,
+            WorkLog.card_id,
+            Card.title,
+            WorkLog.user_id,
+            WorkLog.hours,
+            WorkLog.note,
+            WorkLog.created_at,
+        )
+        .join(Card, WorkLog.card_id == Card.id)
+        .where(
+            Card.board_id == board_id,
+            WorkLog.date >= start_date,
+            WorkLog.date < end_date,
+        )
+        .order_by(WorkLog.date, WorkLog.id)
+    )
+
+
+def _daily_query(board_id: int, start_date: date, end_date: date):
+    return (
+        select(
+            WorkLogDaily.date,
+            WorkLogDaily.card_id,
+            WorkLogDaily.user_id,
+            WorkLogDaily.hours,
+            WorkLogDaily.entries,
+        )
+        .where(
+            WorkLogDaily.board_id == board_id,
+            WorkLogDaily.date >= start_date,
+            WorkLogDaily.date < end_date,
+        )
+        .order_by(WorkLogDaily.date, WorkLogDaily.card_id, WorkLogDaily.user_id)
+    )
+
+
+DATASETS = {
+    # Un registro por worklog
+    "worklogs": Dataset(
+        columns=(
+            ("id", "int"), ("date", "date"), ("card_id", "int"), ("card_title", "str"),
+            ("user_id", "int"), ("hours", "float"), ("note", "str"), ("created_at", "datetime"),
+        ),
+        query=_worklogs_query,
+        row=tuple,
+    ),
+    # Horas por tarjeta, usuario y día (tabla worklog_daily)
+    "hours-daily": Dataset(
+        columns=(
+            ("date", "date"), ("card_id", "int"), ("user_id", "int"),
+            ("hours", "float"), ("entries", "int"),
+        ),
+        query=_daily_query,
+        row=tuple,
+    ),
+    # Lo mismo que /hours-by-user y /hours-by-card (con la misma
+    # NEOCARE_REPORT_AGGREGATION), para todo el rango. responsible_id es
+    # float: el informe lo devuelve así si hay tarjetas sin responsable
+    "hours-by-user": Dataset(
+        columns=(("user_id", "int"), ("total_hours", "float"), ("tasks_count", "int")),
+        query=hours_by_user_query,
+        row=tuple,
+        report=hours_by_user,
+    ),
+    "hours-by-card": Dataset(
+        columns=(
+            ("card_id", "int"), ("title", "str"), ("responsible_id", "float"),
+            ("status", "str"), ("total_hours", "float"),
+        ),
+        query=hours_by_card_query,
+        row=tuple,
+        report=hours_by_card,
+    ),
+}
+
+
+def _report_batches(dataset: Dataset, board_id: int, start_date: date, end_date: date) -> Iterator[list]:
+    # El informe ya viene agrupado (memoria según el nº de grupos)
+    names = [name for name, _type in dataset.columns]
+    with SessionLocal() as db:
+        rows = [
+            tuple(item[name] for name in names)
+            for item in dataset.report(db, board_id, start_date, end_date)
+        ]
+    for offset in range(0, len(rows), EXPORT_BATCH_SIZE):
+        yield rows[offset:offset + EXPORT_BATCH_SIZE]
+
+
+def _batches(dataset: Dataset, board_id: int, start_date: date, end_date: date) -> Iterator[list]:
+    if dataset.report is not None and settings.report_aggregation != "sql":
+        yield from _report_batches(dataset, board_id, start_date, end_date)
+        return
+
+    # Bloques de filas ya convertidas, leídos con cursor de servidor
+    query = dataset.query(board_id, start_date, end_date).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+    with SessionLocal() as db:
+        for partition in db.execute(query).partitions():
+            yield [dataset.row(row) for row in partition]
+
+
+# ---------------------------------------------------------
+# Formatos
+# ---------------------------------------------------------
+def _text_value(value):
+    # Fechas en ISO 8601 (date y datetime)
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _csv_chunks(columns: tuple, batches: Iterable[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # La cabecera sale antes de ejecutar la consulta
+    writer.writerow([name for name, _type in columns])
+    yield buffer.getvalue()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text_value(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(columns: tuple, batches: Iterable[list]) -> Iterator[str]:
+    names = [name for name, _type in columns]
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(names, map(_text_value, row))), ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+class _ChunkSink:
+    """
+    Destino de escritura para pyarrow que guarda los bytes hasta que
+    se recogen con drain(): cada row group se envía al escribirse.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_chunks(columns: tuple, batches: Iterable[list]) -> Iterator[bytes]:
+    # pyarrow solo se importa al exportar en Parquet (no al arrancar)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            values = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values[i], type=field.type) for i, field in enumerate(schema)],
+                schema=schema,
+            ))
+            yield sink.drain()
+
+    # Pie del fichero (metadatos)
+    yield sink.drain()
+
+
+_WRITERS = {
+    "csv": _csv_chunks,
+    "ndjson": _ndjson_chunks,
+    "parquet": _parquet_chunks,
+}
+
+
+def export_response(
+    dataset_name: str,
+    export_format: str,
+    board_id: int,
+    start_date: date,
+    end_date: date,
+) -> StreamingResponse:
+    """
+    Respuesta en streaming con el conjunto de datos del tablero entre
+    start_date y end_date (exclusivo), en el formato pedido.
+    """
+    dataset = DATASETS[dataset_name]
+    chunks = _WRITERS[export_format](
+        dataset.columns, _batches(dataset, board_id, start_date, end_date)
+    )
+
+    last_day = date.fromordinal(end_date.toordinal() - 1)
+    filename = f"board-{board_id}-{dataset_name}-{start_date.isoformat()}-{last_day.isoformat()}.{export_format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
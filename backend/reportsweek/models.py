@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+# ============================================================
+# Modelo ReportSnapshot
+# Informe ya calculado de una semana cerrada (ver snapshots.py)
+# ============================================================
+
+class ReportSnapshot(Base):
+    __tablename__ = "report_snapshots"
+
+    board_id = Column(
+        Integer,
+        ForeignKey("boards.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # Semana ISO "YYYY-WW", tal como llega en ?week=
+    week = Column(String(7), primary_key=True)
+
+    # "summary" | "summary-counts" | "hours-by-user" | "hours-by-card"
+    report_type = Column(String(20), primary_key=True)
+
+    # Cuerpo JSON de la respuesta, listo para enviar
+    payload = Column(Text, nullable=False)
+    etag = Column(String(40), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,147 @@
+import hashlib
+from datetime import date
+
+from fastapi import Request
+from sqlalchemy import and_, case, distinct, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.models import Board, List
+from backend.cards.models import Card
+from backend.worklogs.models import WorkLogDaily
+
+
+# =========================================================
+# INFORME DE TODOS LOS TABLEROS DEL USUARIO
+# =========================================================
+# En lugar de 3 peticiones por tablero: una consulta para los tableros
+# del usuario (la comprobación de permisos y el ETag salen de ella), una
+# para los contadores de tarjetas y otra para las horas, ambas agrupadas
+# por board_id. Mismos criterios que el resumen semanal y hours-by-user.
+
+
+def user_boards(db: Session, user_id: int) -> list:
+    # (id, name, version) de los tableros del usuario, por id
+    return db.execute(
+        select(Board.id, Board.name, Board.version)
+        .where(Board.user_id == user_id)
+        .order_by(Board.id)
+    ).all()
+
+
+def portfolio_etag(request: Request, boards: list) -> str:
+    # Cambia si cambia cualquiera de los tableros (o se crea/borra uno)
+    versions = ",".join(f"{board.id}:{board.version}" for board in boards)
+    query = "&".join(sorted(request.url.query.split("&")))
+    raw = f"{versions}:{request.url.path}?{query}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def portfolio_report(
+    db: Session,
+    boards: list,
+    start_date: date,
+    end_date: date,
+    by_board: bool = False,
+) -> dict:
+    """
+    Contadores y horas de la semana sumados sobre `boards`
+    (filas de user_boards). Con by_board, también el desglose
+    por tablero.
+    """
+    board_ids = [board.id for board in boards]
+
+    # -------------------------------------------------
+    # Tarjetas nuevas, completadas y vencidas por tablero
+    # -------------------------------------------------
+    in_done = List.name == "Hecho"
+    is_new = and_(Card.created_at >= start_date, Card.created_at < end_date)
+    is_completed = and_(in_done, Card.updated_at >= start_date, Card.updated_at < end_date)
+    is_overdue = and_(~in_done, Card.due_date >= start_date, Card.due_date < end_date)
+
+    count_rows = db.execute(
+        select(
+            Card.board_id,
+            func.sum(case((is_new, 1), else_=0)).label("new_count"),
+            func.sum(case((is_completed, 1), else_=0)).label("completed_count"),
+            func.sum(case((is_overdue, 1), else_=0)).label("overdue_count"),
+        )
+        .join(List, Card.list_id == List.id)
+        .where(Card.board_id.in_(board_ids), or_(is_new, is_completed, is_overdue))
+        .group_by(Card.board_id)
+    ).all()
+    counts = {row.board_id: row for row in count_rows}
+
+    # -------------------------------------------------
+    # Horas por tablero y usuario (tabla worklog_daily)
+    # -------------------------------------------------
+    hour_rows = db.execute(
+        select(
+            WorkLogDaily.board_id,
+            WorkLogDaily.user_id,
+            func.sum(WorkLogDaily.hours).label("hours"),
+            func.count(distinct(WorkLogDaily.card_id)).label("tasks_count"),
+        )
+        .where(
+            WorkLogDaily.board_id.in_(board_ids),
+            WorkLogDaily.date >= start_date,
+            WorkLogDaily.date < end_date,
+        )
+        .group_by(WorkLogDaily.board_id, WorkLogDaily.user_id)
+        .order_by(WorkLogDaily.board_id, WorkLogDaily.user_id)
+    ).all()
+
+    # Una tarjeta es de un solo tablero: las tarjetas distintas de un
+    # usuario son la suma de las de cada tablero.
+    user_hours: dict[int, float] = {}
+    user_tasks: dict[int, int] = {}
+    board_hours: dict[int, list] = {}
+    for row in hour_rows:
+        user_hours[row.user_id] = user_hours.get(row.user_id, 0.0) + row.hours
+        user_tasks[row.user_id] = user_tasks.get(row.user_id, 0) + row.tasks_count
+        board_hours.setdefault(row.board_id, []).append(row)
+
+    def count_of(board_id: int, field: str) -> int:
+        row = counts.get(board_id)
+        return int(getattr(row, field)) if row else 0
+
+    totals = {
+        field: sum(count_of(board_id, field) for board_id in board_ids)
+        for field in ("new_count", "completed_count", "overdue_count")
+    }
+    totals["total_hours"] = sum(user_hours.values())
+
+    report = {
+        "boards_count": len(boards),
+        "totals": totals,
+        "hours_by_user": [
+            {
+                "user_id": user_id,
+                "total_hours": user_hours[user_id],
+                "tasks_count": user_tasks[user_id],
+            }
+            for user_id in sorted(user_hours)
+        ],
+    }
+
+    if by_board:
+        report["boards"] = [
+            {
+                "board_id": board.id,
+                "name": board.name,
+                "new_count": count_of(board.id, "new_count"),
+                "completed_count": count_of(board.id, "completed_count"),
+                "overdue_count": count_of(board.id, "overdue_count"),
+                "total_hours": sum(row.hours for row in board_hours.get(board.id, [])),
+                "hours_by_user": [
+                    {
+                        "user_id": row.user_id,
+                        "total_hours": row.hours,
+                        "tasks_count": row.tasks_count,
+                    }
+                    for row in board_hours.get(board.id, [])
+                ],
+            }
+            for board in boards
+        ]
+
+    return report
@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, case, func, or_, select
 from sqlalchemy.orm import Session
-import pandas as pd
 
 # Dependencias comunes del backend
 from backend.database import get_db
+from backend.async_mode import threadpool_endpoint
 from backend.auth.utils import get_current_user
+from backend.boards.utils import etag_matches, not_modified_response
 
 # Modelos principales
 from backend.models import Board, User, List
 from backend.cards.models import Card
-from backend.worklogs.models import WorkLog
 
 # Utilidades del módulo de reportes
 from .utils import get_week_date_range, serialize_card
+from .snapshots import cached_report, snapshot_or_result
+from .trend import MAX_TREND_WEEKS, weekly_trend
+from .portfolio import portfolio_etag, portfolio_report, user_boards
+from .export import export_response
+from . import aggregation
 
 
 # =========================
@@ -59,7 +68,12 @@ def get_board_or_403(
 @router.get("/{board_id}/summary")
 def weekly_summary(
     board_id: int,
+    request: Request,
+    response: Response,
     week: str = Query(..., description="Week in format YYYY-WW"),
+    detail: Literal["full", "counts"] = Query(
+        "full", description="'counts' devuelve solo los contadores"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -68,11 +82,25 @@ def weekly_summary(
     - tarjetas nuevas
     - tarjetas completadas (lista 'Hecho')
     - tarjetas vencidas
+
+    Con detail=counts solo se devuelven new_count, completed_count y
+    overdue_count (sin las listas de tarjetas).
     """
 
+    # Semana cerrada ya calculada → una sola consulta
+    report_type = "summary-counts" if detail == "counts" else "summary"
+    cached = cached_report(request, db, board_id, current_user.id, week, report_type)
+    if cached:
+        return cached
+
     # --- Seguridad: comprobar que el board es del usuario ---
     board = get_board_or_403(board_id, db, current_user)
 
+    # Sin cambios en el tablero desde la última vez → 304
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
     # --- Calcular rango de fechas de la semana ---
     # (lunes -> lunes siguiente)
     try:
@@ -82,81 +110,85 @@ def weekly_summary(
 
 
     # -------------------------------------------------
-    # TARJETAS NUEVAS
-    # -------------------------------------------------
-    # Tarjetas creadas durante la semana
-    new_cards = (
-        db.query(Card)
-        .filter(
-            Card.board_id == board.id,
-            Card.created_at >= start_date,
-            Card.created_at < end_date,
-        )
-        .all()
-    )
-
-
-    # -------------------------------------------------
-    # TARJETAS COMPLETADAS
-    # -------------------------------------------------
-    # Tarjetas que:
-    # - están en la lista "Hecho"
-    # - se actualizaron durante la semana
-    completed_cards = (
-        db.query(Card)
-        .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            List.name == "Hecho",
-            Card.updated_at >= start_date,
-            Card.updated_at < end_date,
-        )
-        .all()
-    )
-
-
-    # -------------------------------------------------
-    # TARJETAS VENCIDAS
+    # CLASIFICACIÓN DE TARJETAS (una sola consulta)
     # -------------------------------------------------
-    # Tarjetas que:
-    # - tienen fecha de vencimiento en la semana
-    # - NO están en "Hecho"
-    overdue_cards = (
-        db.query(Card)
+    # - nueva: creada durante la semana
+    # - completada: en la lista "Hecho" y actualizada durante la semana
+    # - vencida: vence durante la semana y NO está en "Hecho"
+    # Una tarjeta puede estar en varios grupos (p. ej. nueva y completada)
+    in_done = List.name == "Hecho"
+    is_new = and_(Card.created_at >= start_date, Card.created_at < end_date)
+    is_completed = and_(in_done, Card.updated_at >= start_date, Card.updated_at < end_date)
+    is_overdue = and_(~in_done, Card.due_date >= start_date, Card.due_date < end_date)
+
+    week_cards = (
+        select()
+        .select_from(Card)
         .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            Card.due_date >= start_date,
-            Card.due_date < end_date,
-            List.name != "Hecho",
-        )
-        .all()
+        .where(Card.board_id == board.id, or_(is_new, is_completed, is_overdue))
     )
 
-
-    # --- Respuesta final para frontend ---
-    return {
+    summary = {
         "board_id": board.id,
         "week": week,
         "range": {
             "start": start_date.isoformat(),
             "end": end_date.isoformat(),
         },
-        "new": [serialize_card(c) for c in new_cards],
-        "completed": [serialize_card(c) for c in completed_cards],
-        "overdue": [serialize_card(c) for c in overdue_cards],
+    }
+
+    # --- Solo contadores: una fila con tres sumas condicionales ---
+    if detail == "counts":
+        counts = db.execute(
+            week_cards.add_columns(
+                func.coalesce(func.sum(case((is_new, 1), else_=0)), 0).label("new_count"),
+                func.coalesce(func.sum(case((is_completed, 1), else_=0)), 0).label("completed_count"),
+                func.coalesce(func.sum(case((is_overdue, 1), else_=0)), 0).label("overdue_count"),
+            )
+        ).one()
+        summary.update(counts._asdict())
+        return snapshot_or_result(request, db, board, week, end_date, report_type, summary)
+
+    # --- Resumen completo: cada tarjeta una vez, con sus grupos ---
+    rows = db.execute(
+        week_cards.add_columns(
+            Card.id,
+            Card.title,
+            Card.list_id,
+            Card.user_id,
+            Card.due_date,
+            is_new.label("is_new"),
+            is_completed.label("is_completed"),
+            is_overdue.label("is_overdue"),
+        )
+        .order_by(Card.id)
+    ).all()
+
+    new_cards = [serialize_card(row) for row in rows if row.is_new]
+    completed_cards = [serialize_card(row) for row in rows if row.is_completed]
+    overdue_cards = [serialize_card(row) for row in rows if row.is_overdue]
+
+    # --- Respuesta final para frontend ---
+    summary.update({
+        "new": new_cards,
+        "completed": completed_cards,
+        "overdue": overdue_cards,
         "new_count": len(new_cards),
         "completed_count": len(completed_cards),
         "overdue_count": len(overdue_cards),
-    }
+    })
+    return snapshot_or_result(request, db, board, week, end_date, report_type, summary)
 
 
 # =========================================================
 #  HORAS TRABAJADAS POR USUARIO
 # =========================================================
 @router.get("/{board_id}/hours-by-user")
+@threadpool_endpoint
 def hours_by_user(
     board_id: int,
+    request: Request,
+    response: Response,
     week: str = Query(..., description="Week in format YYYY-WW"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -167,9 +199,19 @@ def hours_by_user(
     - número de tarjetas distintas en las que ha trabajado
     """
 
+    # Semana cerrada ya calculada → una sola consulta
+    cached = cached_report(request, db, board_id, current_user.id, week, "hours-by-user")
+    if cached:
+        return cached
+
     # Seguridad
     board = get_board_or_403(board_id, db, current_user)
 
+    # Sin cambios en el tablero desde la última vez → 304
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
     # Rango semanal
     try:
         start_date, end_date = get_week_date_range(week)
@@ -178,55 +220,23 @@ def hours_by_user(
 
 
     # -------------------------------------------------
-    # CONSULTA BASE
-    # -------------------------------------------------
-    # Se obtienen todos los worklogs de la semana
-    # relacionados con tarjetas del board
-    worklogs_query = (
-        db.query(
-            WorkLog.user_id,
-            WorkLog.card_id,
-            WorkLog.hours
-        )
-        .join(Card, WorkLog.card_id == Card.id)
-        .filter(
-            Card.board_id == board.id,
-            WorkLog.date >= start_date,
-            WorkLog.date < end_date,
-        )
-    )
-
-    rows = worklogs_query.all()
-
-    if not rows:
-        return []
-
-
-    # -------------------------------------------------
-    # AGREGACIÓN CON PANDAS
+    # AGREGACIÓN (GROUP BY en la base de datos)
     # -------------------------------------------------
     # - Suma de horas por usuario
     # - Número de tarjetas distintas por usuario
-    df = pd.DataFrame(rows, columns=["user_id", "card_id", "hours"])
-
-    result_df = (
-        df.groupby("user_id")
-        .agg(
-            total_hours=("hours", "sum"),
-            tasks_count=("card_id", "nunique")
-        )
-        .reset_index()
-    )
-
-    return result_df.to_dict(orient="records")
+    result = aggregation.hours_by_user(db, board.id, start_date, end_date)
+    return snapshot_or_result(request, db, board, week, end_date, "hours-by-user", result)
 
 
 # =========================================================
 #  HORAS TRABAJADAS POR TARJETA
 # =========================================================
 @router.get("/{board_id}/hours-by-card")
+@threadpool_endpoint
 def hours_by_card(
     board_id: int,
+    request: Request,
+    response: Response,
     week: str = Query(..., description="Week in format YYYY-WW"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -238,9 +248,19 @@ def hours_by_card(
     - estado (lista)
     """
 
+    # Semana cerrada ya calculada → una sola consulta
+    cached = cached_report(request, db, board_id, current_user.id, week, "hours-by-card")
+    if cached:
+        return cached
+
     # Seguridad
     board = get_board_or_403(board_id, db, current_user)
 
+    # Sin cambios en el tablero desde la última vez → 304
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
     # Rango semanal
     try:
         start_date, end_date = get_week_date_range(week)
@@ -249,53 +269,144 @@ def hours_by_card(
 
 
     # -------------------------------------------------
-    # CONSULTA BASE
+    # AGREGACIÓN (GROUP BY en la base de datos)
     # -------------------------------------------------
-    # Se obtienen las horas de cada tarjeta de la semana
-    worklogs_query = (
-        db.query(
-            Card.id.label("card_id"),
-            Card.title,
-            Card.user_id.label("responsible_id"),
-            List.name.label("status"),
-            WorkLog.hours
-        )
-        .join(WorkLog, WorkLog.card_id == Card.id)
-        .join(List, Card.list_id == List.id)
-        .filter(
-            Card.board_id == board.id,
-            WorkLog.date >= start_date,
-            WorkLog.date < end_date,
+    # Suma de horas por tarjeta, de más a menos horas
+    result = aggregation.hours_by_card(db, board.id, start_date, end_date)
+    return snapshot_or_result(request, db, board, week, end_date, "hours-by-card", result)
+
+
+# =========================================================
+#  TENDENCIA DE VARIAS SEMANAS Y BURNDOWN
+# =========================================================
+@router.get("/{board_id}/trend")
+@threadpool_endpoint
+def trend(
+    board_id: int,
+    request: Request,
+    response: Response,
+    from_week: str = Query(..., alias="from", description="First week, YYYY-WW"),
+    to_week: str = Query(..., alias="to", description="Last week (inclusive), YYYY-WW"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Devuelve, para cada semana del rango:
+    - tarjetas nuevas, completadas y vencidas
+    - horas por usuario
+    - burndown (tarjetas totales y pendientes al final de la semana)
+    """
+
+    # Seguridad
+    board = get_board_or_403(board_id, db, current_user)
+
+    # Sin cambios en el tablero desde la última vez → 304
+    not_modified = not_modified_response(request, response, board)
+    if not_modified:
+        return not_modified
+
+    # Rango: lunes de la primera semana → lunes siguiente a la última
+    try:
+        start_date, _ = get_week_date_range(from_week)
+        _, end_date = get_week_date_range(to_week)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end_date - start_date).days // 7 > MAX_TREND_WEEKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too long (max {MAX_TREND_WEEKS} weeks)",
         )
-    )
 
-    rows = worklogs_query.all()
+    result = weekly_trend(db, board.id, start_date, end_date)
+    result["from"] = from_week
+    result["to"] = to_week
+    return result
 
-    if not rows:
-        return []
 
+# =========================================================
+#  INFORME DE TODOS LOS TABLEROS DEL USUARIO
+# =========================================================
+@router.get("/portfolio")
+def portfolio(
+    request: Request,
+    response: Response,
+    week: str = Query(..., description="Week in format YYYY-WW"),
+    by_board: bool = Query(False, description="Incluir el desglose por tablero"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Devuelve, sumado sobre todos los tableros del usuario:
+    - tarjetas nuevas, completadas y vencidas
+    - horas por usuario
+    Con by_board=true, también los mismos datos de cada tablero.
+    """
 
-    # -------------------------------------------------
-    # AGREGACIÓN CON PANDAS
-    # -------------------------------------------------
-    # Suma de horas por tarjeta
-    df = pd.DataFrame(
-        rows,
-        columns=[
-            "card_id",
-            "title",
-            "responsible_id",
-            "status",
-            "hours",
-        ],
-    )
+    # Solo tableros del usuario: no hace falta comprobar cada uno
+    boards = user_boards(db, current_user.id)
 
-    result_df = (
-        df.groupby(["card_id", "title", "responsible_id", "status"])
-        .agg(total_hours=("hours", "sum"))
-        .reset_index()
-        .sort_values("total_hours", ascending=False)
-    )
+    # Ningún tablero ha cambiado desde la última vez → 304
+    etag = portfolio_etag(request, boards)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    # Rango semanal
+    try:
+        start_date, end_date = get_week_date_range(week)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    report = {
+        "week": week,
+        "range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+        },
+    }
+    report.update(portfolio_report(db, boards, start_date, end_date, by_board))
+    return report
+
+
+# =========================================================
+#  EXPORTACIÓN (CSV / NDJSON / PARQUET)
+# =========================================================
+@router.get("/{board_id}/export/{dataset}")
+@threadpool_endpoint
+def export(
+    board_id: int,
+    dataset: Literal["worklogs", "hours-daily", "hours-by-user", "hours-by-card"],
+    from_date: date = Query(..., alias="from", description="First day, YYYY-MM-DD"),
+    to_date: date = Query(..., alias="to", description="Last day (inclusive), YYYY-MM-DD"),
+    format: Literal["csv", "ndjson", "parquet"] = Query("csv"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Descarga en streaming, para cualquier rango de fechas:
+    - worklogs: un registro por worklog
+    - hours-daily: horas por tarjeta, usuario y día
+    - hours-by-user / hours-by-card: como los informes semanales
+    """
+
+    # Seguridad
+    board = get_board_or_403(board_id, db, current_user)
+
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export is not available (pyarrow not installed)")
 
-    return result_df.to_dict(orient="records")
+    # Liberar la conexión ya: la exportación usa su propia sesión
+    board_id = board.id
+    db.close()
 
+    return export_response(dataset, format, board_id, from_date, to_date + timedelta(days=1))
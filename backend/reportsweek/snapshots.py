@@ -0,0 +1,195 @@
+import hashlib
+import json
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import delete, select, union
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.boards.utils import etag_matches
+from backend.models import Board
+from backend.cards.models import Card
+from backend.worklogs.models import WorkLog
+
+from .models import ReportSnapshot
+from .utils import get_week_date_range, week_key
+
+
+# =========================================================
+# SNAPSHOTS DE INFORMES DE SEMANAS CERRADAS
+# =========================================================
+# Los informes de una semana ya terminada casi nunca cambian: la primera
+# petición guarda el JSON en report_snapshots y las siguientes lo leen
+# con una sola consulta (clave board_id + week + report_type).
+#
+# Un snapshot se borra cuando una escritura afecta a su semana:
+# - worklogs: la semana de su fecha (la anterior y la nueva al editar)
+# - tarjetas: las semanas de su creación, última edición, vencimiento y
+#   de sus worklogs (aparece en esos informes con su título, lista...)
+# Se borra en la misma transacción que la escritura.
+
+
+def _current_week_start() -> date:
+    today = datetime.now(timezone.utc).date()
+    return date.fromordinal(today.toordinal() - today.weekday())
+
+
+def is_closed_week(end_date: date) -> bool:
+    # La semana ha terminado (end_date es el lunes siguiente, exclusivo)
+    return end_date <= _current_week_start()
+
+
+def _closed_week_of(day) -> bool:
+    if isinstance(day, datetime):
+        day = day.date()
+    return day < _current_week_start()
+
+
+# ---------------------------------------------------------
+# Lectura
+# ---------------------------------------------------------
+def _snapshot_response(request: Request, payload: str, etag: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.report_snapshot_max_age}",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+def cached_report(
+    request: Request,
+    db: Session,
+    board_id: int,
+    user_id: int,
+    week: str,
+    report_type: str,
+) -> Optional[Response]:
+    """
+    Si la semana está cerrada y hay snapshot de un tablero del usuario,
+    devuelve la respuesta (200 o 304). Si no, None y el endpoint calcula
+    el informe como siempre (incluida la comprobación de permisos).
+    """
+    try:
+        _start_date, end_date = get_week_date_range(week)
+    except ValueError:
+        return None
+    if not is_closed_week(end_date):
+        return None
+
+    snapshot = db.execute(
+        select(ReportSnapshot.payload, ReportSnapshot.etag)
+        .join(Board, Board.id == ReportSnapshot.board_id)
+        .where(
+            ReportSnapshot.board_id == board_id,
+            ReportSnapshot.week == week,
+            ReportSnapshot.report_type == report_type,
+            Board.user_id == user_id,
+        )
+    ).first()
+    if snapshot is None:
+        return None
+    return _snapshot_response(request, snapshot.payload, snapshot.etag)
+
+
+# ---------------------------------------------------------
+# Escritura
+# ---------------------------------------------------------
+def snapshot_or_result(
+    request: Request,
+    db: Session,
+    board: Board,
+    week: str,
+    end_date: date,
+    report_type: str,
+    result,
+):
+    """
+    Semana abierta: devuelve `result` sin más. Semana cerrada: guarda el
+    snapshot y lo devuelve con ETag propio y Cache-Control largo.
+
+    Solo se guarda si la versión del tablero no ha cambiado desde que se
+    leyó: si una escritura se ha colado mientras se calculaba, el
+    informe podría no incluirla y se devuelve sin guardar.
+    """
+    if not is_closed_week(end_date):
+        return result
+
+    payload = json.dumps(
+        result, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    )
+    raw = f"{board.id}:{week}:{report_type}:{payload}"
+    etag = '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+    try:
+        # FOR UPDATE: espera a una escritura en curso del tablero
+        current_version = db.execute(
+            select(Board.version).where(Board.id == board.id).with_for_update()
+        ).scalar_one()
+        if current_version != board.version:
+            db.rollback()
+            return result
+
+        db.merge(ReportSnapshot(
+            board_id=board.id,
+            week=week,
+            report_type=report_type,
+            payload=payload,
+            etag=etag,
+        ))
+        db.commit()
+    except SQLAlchemyError:
+        # Otro proceso lo ha guardado a la vez (o la BD está ocupada):
+        # el informe es correcto igualmente, solo queda sin guardar
+        db.rollback()
+
+    return _snapshot_response(request, payload, etag)
+
+
+# ---------------------------------------------------------
+# Invalidación
+# ---------------------------------------------------------
+def invalidate_report_snapshots(db: Session, board_id: int, dates: Iterable) -> None:
+    """
+    Borra los snapshots del tablero de las semanas (cerradas) de esas
+    fechas. Llamar en la transacción de la escritura.
+    """
+    weeks = {week_key(day) for day in dates if day is not None and _closed_week_of(day)}
+    if not weeks:
+        return
+    db.execute(
+        delete(ReportSnapshot)
+        .where(ReportSnapshot.board_id == board_id, ReportSnapshot.week.in_(weeks))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def invalidate_card_snapshots(db: Session, card_ids: Iterable[int]) -> None:
+    """
+    Borra los snapshots de las semanas en las que aparecen las tarjetas
+    (creación, última edición, vencimiento y worklogs). Llamar antes de
+    modificar o borrar las tarjetas: se leen sus fechas actuales.
+    """
+    card_ids = list(card_ids)
+    if not card_ids:
+        return
+
+    dated = union(
+        select(Card.board_id, Card.created_at.label("day")).where(Card.id.in_(card_ids)),
+        select(Card.board_id, Card.updated_at).where(Card.id.in_(card_ids)),
+        select(Card.board_id, Card.due_date).where(Card.id.in_(card_ids)),
+        select(Card.board_id, WorkLog.date)
+        .join(Card, WorkLog.card_id == Card.id)
+        .where(WorkLog.card_id.in_(card_ids)),
+    )
+
+    dates_by_board: dict[int, list] = {}
+    for board_id, day in db.execute(dated):
+        dates_by_board.setdefault(board_id, []).append(day)
+
+    for board_id, dates in dates_by_board.items():
+        invalidate_report_snapshots(db, board_id, dates)
@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Date, case, func, select
+from sqlalchemy.orm import Session
+
+from backend.models import List
+from backend.cards.models import Card
+from backend.worklogs.models import WorkLogDaily
+
+from .utils import week_key
+
+
+# =========================================================
+# TENDENCIA Y BURNDOWN DE VARIAS SEMANAS
+# =========================================================
+# Una consulta agrupada por día para cada métrica sobre todo el rango
+# (en lugar de 3 peticiones por semana); los días se reparten en semanas
+# con NumPy (bincount sobre el índice de semana) y el burndown es una
+# suma acumulada. Mismos criterios que el resumen semanal:
+# - nuevas: creadas en la semana
+# - completadas: en "Hecho" y actualizadas en la semana
+# - vencidas: vencen en la semana y NO están en "Hecho"
+
+# Máximo de semanas por petición (dos años)
+MAX_TREND_WEEKS = 104
+
+DONE_LIST_NAME = "Hecho"
+
+
+def _day(column):
+    # Fecha (sin hora) de una columna, como Date en SQLite y PostgreSQL
+    return func.date(column, type_=Date)
+
+
+def weekly_trend(db: Session, board_id: int, start_date: date, end_date: date) -> dict:
+    """
+    Series semanales entre start_date (lunes) y end_date (lunes
+    siguiente a la última semana, exclusivo). Todas las listas van
+    alineadas con `weeks`.
+    """
+    # NumPy solo lo usa este informe: se importa aquí, no al arrancar
+    import numpy as np
+
+    week_count = (end_date - start_date).days // 7
+    weeks = [week_key(start_date + timedelta(weeks=i)) for i in range(week_count)]
+    start_ordinal = start_date.toordinal()
+
+    def bucket(rows):
+        # [(día, valor)] → total por semana
+        if not rows:
+            return np.zeros(week_count)
+        days = np.fromiter((day.toordinal() for day, _value in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((value for _day, value in rows), dtype=np.float64, count=len(rows))
+        return np.bincount((days - start_ordinal) // 7, weights=values, minlength=week_count)
+
+    in_done = List.name == DONE_LIST_NAME
+    board_cards = (
+        select()
+        .select_from(Card)
+        .join(List, Card.list_id == List.id)
+        .where(Card.board_id == board_id)
+    )
+
+    # -------------------------------------------------
+    # Tarjetas nuevas, completadas y vencidas por día
+    # -------------------------------------------------
+    created_day = _day(Card.created_at)
+    new = bucket(db.execute(
+        board_cards.add_columns(created_day, func.count())
+        .where(Card.created_at >= start_date, Card.created_at < end_date)
+        .group_by(created_day)
+    ).all())
+
+    updated_day = _day(Card.updated_at)
+    completed = bucket(db.execute(
+        board_cards.add_columns(updated_day, func.count())
+        .where(in_done, Card.updated_at >= start_date, Card.updated_at < end_date)
+        .group_by(updated_day)
+    ).all())
+
+    overdue = bucket(db.execute(
+        board_cards.add_columns(Card.due_date, func.count())
+        .where(~in_done, Card.due_date >= start_date, Card.due_date < end_date)
+        .group_by(Card.due_date)
+    ).all())
+
+    # -------------------------------------------------
+    # Horas por usuario y día (tabla worklog_daily)
+    # -------------------------------------------------
+    hour_rows = db.execute(
+        select(WorkLogDaily.user_id, WorkLogDaily.date, func.sum(WorkLogDaily.hours))
+        .where(
+            WorkLogDaily.board_id == board_id,
+            WorkLogDaily.date >= start_date,
+            WorkLogDaily.date < end_date,
+        )
+        .group_by(WorkLogDaily.user_id, WorkLogDaily.date)
+    ).all()
+
+    rows_by_user: dict[int, list] = {}
+    for user_id, day, hours in hour_rows:
+        rows_by_user.setdefault(user_id, []).append((day, hours))
+
+    hours_by_user = []
+    for user_id in sorted(rows_by_user):
+        weekly = bucket(rows_by_user[user_id])
+        hours_by_user.append({
+            "user_id": user_id,
+            "hours": weekly.tolist(),
+            "total_hours": float(weekly.sum()),
+        })
+
+    # -------------------------------------------------
+    # Burndown: tarjetas pendientes al final de cada semana
+    # -------------------------------------------------
+    # Pendientes = creadas hasta esa fecha - completadas hasta esa fecha
+    # (estado actual: una tarjeta en "Hecho" cuenta como completada
+    # en su última actualización; las borradas no cuentan)
+    before = db.execute(
+        board_cards.add_columns(
+            func.coalesce(func.sum(case((Card.created_at < start_date, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((in_done & (Card.updated_at < start_date), 1), else_=0)), 0),
+        )
+    ).one()
+    scope = before[0] + np.cumsum(new)
+    done = before[1] + np.cumsum(completed)
+    remaining = scope - done
+
+    def as_ints(series):
+        return [int(value) for value in series]
+
+    return {
+        "board_id": board_id,
+        "range": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+        },
+        "weeks": weeks,
+        "new_count": as_ints(new),
+        "completed_count": as_ints(completed),
+        "overdue_count": as_ints(overdue),
+        "hours_by_user": hours_by_user,
+        "burndown": {
+            "scope": as_ints(scope),
+            "remaining": as_ints(remaining),
+        },
+    }
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 import re
 
 from backend.cards.models import Card
@@ -81,11 +81,26 @@ def get_week_date_range(week: str) -> tuple[date, date]:
         start_date = date.fromisocalendar(year, week_number, 1)
 
         # Lunes de la semana siguiente
-        # (se usa como límite exclusivo en SQL)
-        end_date = date.fromisocalendar(year, week_number + 1, 1)
+        # (se usa como límite exclusivo en SQL; sumando 7 días también
+        # vale para la última semana del año)
+        end_date = start_date + timedelta(days=7)
 
     except ValueError:
         # Si la semana no existe (ej: 2025-54)
         raise ValueError("Invalid ISO week")
 
     return start_date, end_date
+
+
+# =========================================================
+# FUNCIÓN: week_key
+# =========================================================
+def week_key(day) -> str:
+    """
+    Semana ISO de una fecha (o fecha y hora) en el formato YYYY-WW
+    que usan los endpoints (inversa de get_week_date_range).
+    """
+    if isinstance(day, datetime):
+        day = day.date()
+    year, week, _ = day.isocalendar()
+    return f"{year}-{week:02d}"
@@ -0,0 +1,194 @@
+"""
+Medición del arranque en frío de un worker.
+
+Uso:
+    python -m backend.startup_check [--runs 5] [--import-budget-ms 1000]
+                                    [--startup-budget-ms 1500] [--rss-budget-mb 120]
+                                    [--top 15]
+
+Lanza `--runs` procesos nuevos que importan backend.main, arrancan la
+aplicación (lifespan) y responden a /ping, y mide en cada uno:
+
+- import_ms: tiempo de `import backend.main`
+- startup_ms: import + arranque + primera petición
+- rss_mb: memoria máxima del proceso
+
+Compara la mediana con los presupuestos y termina con código 1 si se
+pasa de alguno o si al arrancar se ha cargado un módulo pesado que debe
+importarse solo en el endpoint que lo usa (pandas, numpy, pyarrow).
+Con --top muestra además los módulos más lentos según -X importtime.
+
+Usa un SQLite temporal con el esquema migrado; no toca la BD real.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+# Módulos que no deben cargarse al arrancar: se importan dentro de los
+# endpoints que los necesitan
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+
+# Presupuestos por defecto (medianas)
+IMPORT_BUDGET_MS = 1000
+STARTUP_BUDGET_MS = 1500
+RSS_BUDGET_MB = 120
+
+
+# Memoria máxima del proceso en MB. En Linux, VmHWM: ru_maxrss conserva
+# el máximo del proceso padre antes del exec (p. ej. si lanza pytest)
+_PEAK_RSS = """
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+"""
+
+# Código del proceso medido (un intérprete nuevo por ejecución)
+_CHILD = _PEAK_RSS + """
+import json, sys, time
+
+started = time.perf_counter()
+import backend.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(backend.main.app) as client:
+    assert client.get("/ping").status_code == 200
+ready = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - started) * 1000,
+    "rss_mb": peak_rss_mb(),
+    "heavy": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def child_environment(database_url: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env["NEOCARE_BCRYPT_WORKERS"] = "0"
+    env["NEOCARE_AUTO_MIGRATE"] = "0"
+    env.setdefault("NEOCARE_DB_ECHO", "0")
+    return env
+
+
+def _run_child(env: dict, cwd: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        env=env, cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+_IMPORTTIME_CHILD = _PEAK_RSS + """
+import backend.main
+print(peak_rss_mb())
+"""
+
+
+def import_profile(env: dict, cwd: str) -> dict:
+    """
+    `import backend.main` en un proceso nuevo con -X importtime:
+    - modules: [(µs acumulados, profundidad, módulo)] en orden de carga
+    - import_ms: acumulado de backend.main
+    - rss_mb: memoria máxima del proceso tras el import
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORTTIME_CHILD],
+        env=env, cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((int(cumulative), depth, name.strip()))
+
+    import_us = max(cumulative for cumulative, _depth, name in modules if name == "backend.main")
+    return {
+        "modules": modules,
+        "import_ms": import_us / 1000,
+        "rss_mb": float(completed.stdout.strip().splitlines()[-1]),
+    }
+
+
+def _slowest_imports(env: dict, cwd: str, top: int) -> list[tuple[int, str]]:
+    """
+    Módulos con más tiempo acumulado (-X importtime), solo los de primer
+    nivel bajo backend.main para no contar dos veces el mismo árbol.
+    """
+    rows = [
+        (cumulative, name)
+        for cumulative, depth, name in import_profile(env, cwd)["modules"]
+        if depth <= 1
+    ]
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempo y memoria de arranque del backend")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos medidos (se usa la mediana)")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--rss-budget-mb", type=float, default=RSS_BUDGET_MB)
+    parser.add_argument("--top", type=int, default=0, help="Mostrar los N imports más lentos")
+    args = parser.parse_args(argv)
+
+    # Directorio raíz del proyecto (el que contiene el paquete backend)
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = child_environment(f"sqlite:///{tmpdir}/startup_check.db")
+        subprocess.run(
+            [sys.executable, "-m", "backend.migrations", "upgrade"],
+            env=env, cwd=cwd, capture_output=True, check=True,
+        )
+
+        # Una ejecución de calentamiento (caché de bytecode y del disco)
+        _run_child(env, cwd)
+        runs = [_run_child(env, cwd) for _ in range(max(args.runs, 1))]
+
+        if args.top:
+            print("Imports más lentos (acumulado):")
+            for cumulative, name in _slowest_imports(env, cwd, args.top):
+                print(f"  {cumulative / 1000:8.1f} ms  {name}")
+            print()
+
+    failures = []
+    for key, budget, unit in (
+        ("import_ms", args.import_budget_ms, "ms"),
+        ("startup_ms", args.startup_budget_ms, "ms"),
+        ("rss_mb", args.rss_budget_mb, "MB"),
+    ):
+        median = statistics.median(run[key] for run in runs)
+        status = "ok" if median <= budget else "EXCEDIDO"
+        print(f"{key:<11} mediana {median:8.1f} {unit}  (presupuesto {budget:.0f} {unit})  {status}")
+        if median > budget:
+            failures.append(key)
+
+    heavy = sorted({module for run in runs for module in run["heavy"]})
+    if heavy:
+        print(f"Módulos pesados cargados al arrancar: {', '.join(heavy)}")
+        failures.append("heavy")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+Importación de worklogs en lote (hojas de horas de otra herramienta).
+
+Acepta CSV (con cabecera) o NDJSON con los campos:
+    card_id, user, date, hours, note
+
+- user: id o email del usuario; vacío = quien importa. Por la API solo
+  se admite quien importa; atribuir horas a otros usuarios solo se
+  puede desde esta CLI (operadores)
+- date: YYYY-MM-DD
+- note: opcional (máx. 200 caracteres)
+
+Mismas reglas que POST /cards/{card_id}/worklogs (horas > 0, sin
+fechas futuras, la tarjeta debe existir) y además la tarjeta debe ser
+de un tablero de quien importa. Cada fila con errores se informa con
+su número de línea. Reimportar un fichero duplica sus horas.
+
+Uso:
+    python -m backend.worklogs.importer horas.csv --user-email jefa@empresa.com
+        [--format csv|ndjson] [--partial] [--dry-run] [--batch-size 10000]
+
+Sin --partial, cualquier fila errónea deja la importación sin aplicar.
+Termina con código 1 si hay errores.
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+from collections import defaultdict
+from itertools import islice
+from operator import itemgetter
+from datetime import date
+from typing import Iterable, Iterator, Optional, TextIO
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from .. import models  # noqa: F401  (registra User/Board para las relaciones)
+from ..models import Board, User
+from ..boards.utils import touch_board
+from ..cards.models import Card
+from ..events.utils import publish_board_event
+from ..reportsweek.snapshots import invalidate_report_snapshots
+from .models import WorkLog
+from .rollup import record_version_rollups
+
+
+# Filas validadas e insertadas de una vez (un executemany / COPY)
+IMPORT_BATCH_SIZE = 10000
+
+# Errores devueltos como mucho (errors_count lleva la cuenta total)
+IMPORT_MAX_ERRORS = 1000
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Campos de cada fila del fichero
+IMPORT_FIELDS = ("card_id", "user", "date", "hours", "note")
+
+# Columnas insertadas en worklogs
+_COLUMNS = ("card_id", "user_id", "date", "hours", "note", "row_version")
+
+
+class ImportOutcome:
+    """Resultado de una importación: resumen y eventos a publicar."""
+
+    def __init__(self):
+        self.applied = False
+        self.rows = 0
+        self.imported = 0
+        self.errors_count = 0
+        self.errors: list[dict] = []
+        # board_id → (versión, {"count": n, "card_ids": [...]})
+        self.events: dict[int, tuple[int, dict]] = {}
+
+    def fail(self, line: int, detail: str) -> None:
+        self.errors_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "applied": self.applied,
+            "rows": self.rows,
+            "imported": self.imported,
+            "errors_count": self.errors_count,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "boards": sorted(self.events),
+        }
+
+
+# =========================================================
+# LECTURA Y VALIDACIÓN DE CADA FILA
+# =========================================================
+def read_rows(stream: TextIO, import_format: str) -> Iterator[tuple[int, Optional[tuple]]]:
+    """
+    (nº de línea, valores de IMPORT_FIELDS) de cada fila, sin cargar el
+    fichero entero. None si la línea no es un objeto JSON.
+    """
+    if import_format == "csv":
+        reader = csv.reader(stream)
+        header = [name.strip() for name in next(reader, [])]
+        positions = [header.index(name) if name in header else None for name in IMPORT_FIELDS]
+        width = len(header)
+
+        if None not in positions:
+            pick = itemgetter(*positions)
+        else:
+            def pick(row):
+                return tuple(row[i] if i is not None else None for i in positions)
+
+        for row in reader:
+            if len(row) < width:
+                row += [None] * (width - len(row))
+            yield reader.line_num, pick(row)
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            raw = json.loads(text)
+        except ValueError:
+            raw = None
+        if isinstance(raw, dict):
+            yield line, tuple(raw.get(name) for name in IMPORT_FIELDS)
+        else:
+            yield line, None
+
+
+def _parse(values: Optional[tuple], today: date, dates: dict) -> tuple:
+    """
+    (card_id, user, date, hours, note) ya convertidos.
+    Lanza ValueError con el motivo si la fila no es válida.
+    `dates`: fechas ya leídas (en una hoja de horas se repiten mucho).
+    """
+    if values is None:
+        raise ValueError("Invalid JSON object")
+    card_id, user, day, hours, note = values
+
+    try:
+        card_id = int(card_id)
+    except (TypeError, ValueError):
+        raise ValueError("card_id must be an integer")
+
+    try:
+        hours = float(hours)
+    except (TypeError, ValueError):
+        raise ValueError("hours must be a number")
+    if not hours > 0 or hours == math.inf:
+        raise ValueError("Hours must be > 0")
+
+    parsed_day = dates.get(day)
+    if parsed_day is None:
+        try:
+            parsed_day = date.fromisoformat(str(day).strip())
+        except ValueError:
+            raise ValueError("date must have format YYYY-MM-DD")
+        dates[day] = parsed_day
+    if parsed_day > today:
+        raise ValueError("Date cannot be in the future")
+
+    if note == "":
+        note = None
+    elif note is not None:
+        note = str(note)
+        if len(note) > 200:
+            raise ValueError("note is longer than 200 characters")
+
+    user = str(user).strip() if user is not None else ""
+
+    return card_id, user, parsed_day, hours, note
+
+
+# =========================================================
+# IMPORTACIÓN
+# =========================================================
+class _Lookups:
+    """
+    Tarjetas y usuarios ya consultados. Cada lote pide los que faltan
+    con una consulta por tipo, nunca una por fila.
+    Sin any_user solo se resuelve quien importa y no se consulta ningún
+    otro usuario (ni se revela si existe).
+    """
+
+    def __init__(self, db: Session, owner: User, any_user: bool = False):
+        self.db = db
+        self.owner = owner
+        self.any_user = any_user
+        # card_id → board_id (None si no existe), owned: tableros propios
+        self.cards: dict[int, Optional[int]] = {}
+        self.owned: set[int] = set()
+        # id / email → user_id (None si no existe o no se admite)
+        self.users: dict[str, Optional[int]] = {
+            "": owner.id,
+            str(owner.id): owner.id,
+            owner.email: owner.id,
+        }
+
+    def load(self, parsed: list) -> None:
+        # parsed: (línea, card_id, user, date, hours, note)
+        card_ids = {row[1] for row in parsed if row[1] not in self.cards}
+        if card_ids:
+            rows = self.db.execute(
+                select(Card.id, Card.board_id, Board.user_id)
+                .join(Board, Card.board_id == Board.id)
+                .where(Card.id.in_(card_ids))
+            ).all()
+            self.cards.update(dict.fromkeys(card_ids))
+            for card_id, board_id, board_owner in rows:
+                self.cards[card_id] = board_id
+                if board_owner == self.owner.id:
+                    self.owned.add(board_id)
+
+        refs = {row[2] for row in parsed if row[2] not in self.users}
+        if refs and not self.any_user:
+            self.users.update(dict.fromkeys(refs))
+        elif refs:
+            ids = defaultdict(list)
+            for ref in refs:
+                if ref.isdigit():
+                    ids[int(ref)].append(ref)
+            emails = {ref for ref in refs if not ref.isdigit()}
+            self.users.update(dict.fromkeys(refs))
+            if ids:
+                for user_id in self.db.scalars(select(User.id).where(User.id.in_(ids))):
+                    self.users.update(dict.fromkeys(ids[user_id], user_id))
+            if emails:
+                for user_id, email in self.db.execute(
+                    select(User.id, User.email).where(User.email.in_(emails))
+                ):
+                    self.users[email] = user_id
+
+
+def _insert_worklogs(db: Session, rows: list[tuple]) -> None:
+    """
+    Inserta las filas (tuplas en el orden de _COLUMNS) con la vía más
+    rápida del driver: COPY con psycopg2, executemany directo sobre el
+    cursor con SQLite (sin procesar parámetros fila a fila en
+    SQLAlchemy) y, con otros drivers, el executemany de SQLAlchemy.
+    created_at / updated_at los pone la base de datos.
+    """
+    driver = db.get_bind().dialect.driver
+    table = WorkLog.__tablename__
+    columns = ", ".join(_COLUMNS)
+
+    if driver == "psycopg2":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # Campo vacío sin comillas = NULL en COPY ... CSV
+        writer.writerows(rows)
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        return
+
+    if driver == "pysqlite":
+        # Fechas como texto ISO, igual que las guarda SQLAlchemy
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                [(card_id, user_id, day.isoformat(), hours, note, version)
+                 for card_id, user_id, day, hours, note, version in rows],
+            )
+        finally:
+            cursor.close()
+        return
+
+    db.execute(insert(WorkLog.__table__), [dict(zip(_COLUMNS, row)) for row in rows])
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def import_worklogs(
+    db: Session,
+    owner: User,
+    rows: Iterable[tuple[int, Optional[tuple]]],
+    atomic: bool = True,
+    dry_run: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    any_user: bool = False,
+) -> ImportOutcome:
+    """
+    Valida e inserta las filas (de read_rows) en una sola transacción,
+    por lotes de `batch_size`. Con atomic=True una fila errónea deja
+    todo sin aplicar (pero se siguen validando las demás para informar
+    de todos los errores); con atomic=False se importan las válidas.
+    Con any_user=False (la API) la columna user solo admite a `owner`;
+    cualquier otro valor da el mismo error que un tablero ajeno.
+
+    Cada tablero afectado recibe una versión nueva; contadores de las
+    tarjetas, worklog_daily y snapshots de informes se actualizan una
+    vez por tablero al final, no por fila.
+    """
+    outcome = ImportOutcome()
+    lookups = _Lookups(db, owner, any_user)
+    today = date.today()
+
+    versions: dict[int, int] = {}
+    card_hours: dict[int, float] = defaultdict(float)
+    board_dates: dict[int, set] = defaultdict(set)
+    board_counts: dict[int, int] = defaultdict(int)
+
+    dates: dict = {}
+    for batch in _batches(rows, batch_size):
+        outcome.rows += len(batch)
+
+        parsed = []
+        for line, values in batch:
+            try:
+                parsed.append((line, *_parse(values, today, dates)))
+            except ValueError as e:
+                outcome.fail(line, str(e))
+
+        lookups.load(parsed)
+        cards, users, owned = lookups.cards, lookups.users, lookups.owned
+
+        # Sin aplicar (dry run o ya hay errores en modo atómico):
+        # solo se sigue validando
+        inserting = not dry_run and not (atomic and outcome.errors_count)
+
+        insert_rows = []
+        for line, card_id, user, day, hours, note in parsed:
+            board_id = cards.get(card_id)
+            user_id = users.get(user)
+            if board_id is None:
+                outcome.fail(line, "Card not found")
+                inserting = inserting and not atomic
+            elif board_id not in owned:
+                outcome.fail(line, "You do not have access to this board")
+                inserting = inserting and not atomic
+            elif user_id is None:
+                outcome.fail(line, "User not found" if any_user else "You do not have access to this board")
+                inserting = inserting and not atomic
+            elif inserting:
+                version = versions.get(board_id)
+                if version is None:
+                    version = versions[board_id] = touch_board(db, board_id)
+                insert_rows.append((card_id, user_id, day, hours, note, version))
+                card_hours[card_id] += hours
+                board_dates[board_id].add(day)
+                board_counts[board_id] += 1
+
+        if inserting and insert_rows:
+            # En el orden del índice (tarjeta, fecha): menos páginas tocadas
+            insert_rows.sort(key=itemgetter(0, 2))
+            _insert_worklogs(db, insert_rows)
+            outcome.imported += len(insert_rows)
+
+    if dry_run or (atomic and outcome.errors_count) or not versions:
+        db.rollback()
+        outcome.imported = 0
+        return outcome
+
+    # -----------------------------------------------------
+    # Contadores de las tarjetas: un UPDATE (executemany)
+    # -----------------------------------------------------
+    cards = Card.__table__
+    db.execute(
+        update(cards)
+        .where(cards.c.id == bindparam("_card_id"))
+        .values({
+            "total_hours": cards.c.total_hours + bindparam("_hours"),
+            "row_version": bindparam("_row_version"),
+            "updated_at": cards.c.updated_at,
+        }),
+        [
+            {
+                "_card_id": card_id,
+                "_hours": hours,
+                "_row_version": versions[lookups.cards[card_id]],
+            }
+            for card_id, hours in card_hours.items()
+        ],
+    )
+
+    # -----------------------------------------------------
+    # worklog_daily y snapshots: una vez por tablero
+    # -----------------------------------------------------
+    for board_id, version in versions.items():
+        record_version_rollups(db, board_id, version, min(board_dates[board_id]), max(board_dates[board_id]))
+        invalidate_report_snapshots(db, board_id, board_dates[board_id])
+
+    db.commit()
+
+    outcome.applied = True
+    board_cards = defaultdict(list)
+    for card_id in sorted(card_hours):
+        board_cards[lookups.cards[card_id]].append(card_id)
+    outcome.events = {
+        board_id: (version, {"count": board_counts[board_id], "card_ids": board_cards[board_id]})
+        for board_id, version in versions.items()
+    }
+    return outcome
+
+
+# =========================================================
+# CLI
+# =========================================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Importar worklogs desde CSV o NDJSON")
+    parser.add_argument("file", help="Fichero a importar ('-' = entrada estándar)")
+    parser.add_argument("--user-email", required=True, help="Quien importa (dueño de los tableros)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None,
+                        help="Por defecto, según la extensión del fichero")
+    parser.add_argument("--partial", action="store_true", help="Importar las filas válidas aunque haya errores")
+    parser.add_argument("--dry-run", action="store_true", help="Solo validar, sin escribir")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    import_format = args.format or ("csv" if args.file.endswith(".csv") else "ndjson")
+
+    with SessionLocal() as db:
+        owner = db.query(User).filter(User.email == args.user_email).first()
+        if owner is None:
+            print(f"Usuario no encontrado: {args.user_email}", file=sys.stderr)
+            return 1
+
+        if args.file == "-":
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        else:
+            stream = open(args.file, encoding="utf-8-sig", newline="")
+        with stream:
+            outcome = import_worklogs(
+                db,
+                owner,
+                read_rows(stream, import_format),
+                atomic=not args.partial,
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+                any_user=True,
+            )
+
+    # Con NEOCARE_EVENTS_BACKEND=memory los eventos no salen de este
+    # proceso; los clientes verán la versión nueva al resincronizar
+    for board_id, (version, data) in outcome.events.items():
+        publish_board_event(board_id, version, "worklogs.imported", data)
+
+    for error in outcome.errors:
+        print(f"línea {error['line']}: {error['detail']}", file=sys.stderr)
+    if outcome.errors_count > len(outcome.errors):
+        print(f"... y {outcome.errors_count - len(outcome.errors)} errores más", file=sys.stderr)
+
+    action = "importadas" if outcome.applied else "sin aplicar"
+    print(f"Filas: {outcome.rows}, {action}: {outcome.imported}, con errores: {outcome.errors_count}")
+    return 1 if outcome.errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, Date, String, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -54,8 +54,60 @@ class WorkLog(Base):
         onupdate=func.now()
     )
 
+    # Versión del tablero en el último cambio (sincronización delta)
+    row_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # --------------------------------------------------------
     # Relaciones ORM (opcional pero recomendado)
     # --------------------------------------------------------
     card = relationship("Card", back_populates="worklogs")
     user = relationship("User", back_populates="worklogs")
+
+    # --------------------------------------------------------
+    # Índices
+    # --------------------------------------------------------
+    # (user_id, date): "Mis horas" por semana
+    # (card_id, date): horas de una tarjeta e informes por tablero;
+    # también sirve para los filtros solo por card_id
+    __table_args__ = (
+        Index("ix_worklogs_user_date", "user_id", "date"),
+        Index("ix_worklogs_card_date", "card_id", "date"),
+    )
+
+
+# ============================================================
+# Modelo WorkLogDaily
+# Horas agregadas por tarjeta, usuario y día (ver worklogs/rollup.py)
+# ============================================================
+
+class WorkLogDaily(Base):
+    __tablename__ = "worklog_daily"
+
+    card_id = Column(
+        Integer,
+        ForeignKey("cards.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    date = Column(Date, primary_key=True)
+
+    # Tablero de la tarjeta (copiado: los informes filtran por tablero)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+
+    # Suma de las horas de los worklogs de la fila, sin redondear (se
+    # recalcula desde ellos en cada cambio, ver worklogs/rollup.py)
+    hours = Column(Float, nullable=False, default=0)
+
+    # Nº de worklogs agregados en la fila (sin filas a 0)
+    entries = Column(Integer, nullable=False, default=0)
+
+    # (board_id, date): informes por tablero y semana
+    # (user_id, date): horas de un usuario en un periodo
+    __table_args__ = (
+        Index("ix_worklog_daily_board_date", "board_id", "date"),
+        Index("ix_worklog_daily_user_date", "user_id", "date"),
+    )
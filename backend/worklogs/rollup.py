@@ -0,0 +1,241 @@
+"""
+Tabla worklog_daily: horas por tarjeta, usuario y día.
+
+La mantienen los handlers de worklogs en la misma transacción que el
+worklog (record_worklog_change) y la leen los informes de horas, que así
+recorren una fila por tarjeta/usuario/día en lugar de cada worklog.
+
+Cada fila guarda la suma de las horas de sus worklogs tal cual (mismo
+tipo que worklogs.hours, sin redondear). Al crear, editar o borrar un
+worklog la fila se recalcula desde sus worklogs en lugar de restar
+diferencias, que con floats irían acumulando error.
+
+Comprobar y reparar:
+    python -m backend.worklogs.rollup [--board-id 12] [--dry-run]
+
+Con --dry-run solo compara y termina con código 1 si hay diferencias.
+"""
+
+import argparse
+import sys
+from datetime import date
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from .. import models  # noqa: F401  (registra User/Board para las relaciones)
+from ..cards.counters import HOURS_TOLERANCE
+from ..cards.models import Card
+from .models import WorkLog, WorkLogDaily
+
+
+ROLLUP_COLUMNS = ["card_id", "user_id", "date", "board_id", "hours", "entries"]
+
+
+class WorkLogKey(NamedTuple):
+    # Fila de worklog_daily a la que aporta un worklog (y sus horas)
+    card_id: int
+    user_id: int
+    date: object
+    hours: float
+
+
+# =========================================================
+# MANTENIMIENTO INCREMENTAL
+# =========================================================
+def _refresh(db: Session, board_id: int, key: WorkLogKey) -> None:
+    # Recalcula la fila de `key` desde sus worklogs (sin worklogs, sin fila)
+    db.execute(
+        delete(WorkLogDaily)
+        .where(
+            WorkLogDaily.card_id == key.card_id,
+            WorkLogDaily.user_id == key.user_id,
+            WorkLogDaily.date == key.date,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(WorkLogDaily.__table__.insert().from_select(
+        ROLLUP_COLUMNS,
+        expected_rollups().where(
+            Card.board_id == board_id,
+            WorkLog.card_id == key.card_id,
+            WorkLog.user_id == key.user_id,
+            WorkLog.date == key.date,
+        ),
+    ))
+
+
+def record_worklog_change(
+    db: Session,
+    board_id: int,
+    old: Optional[WorkLogKey] = None,
+    new: Optional[WorkLogKey] = None,
+) -> None:
+    """
+    Actualiza worklog_daily tras el alta (solo new), baja (solo old) o
+    edición (ambos) de un worklog. Llamar en la transacción del cambio,
+    después de aplicarlo a la sesión.
+    """
+    db.flush()
+
+    keys = {key[:3]: key for key in (old, new) if key is not None}
+    for key in keys.values():
+        _refresh(db, board_id, key)
+
+
+def record_version_rollups(
+    db: Session,
+    board_id: int,
+    version: int,
+    first_day: date,
+    last_day: date,
+) -> None:
+    """
+    Suma a worklog_daily los worklogs del tablero creados con `version`
+    entre first_day y last_day (importación en lote: una sola sentencia
+    en lugar de una por worklog). Solo se añaden horas, así que sumar a
+    la fila existente no acumula error. La versión debe ser nueva, de
+    esta misma transacción.
+    """
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    rows = expected_rollups().where(
+        Card.board_id == board_id,
+        WorkLog.date >= first_day,
+        WorkLog.date <= last_day,
+        WorkLog.row_version == version,
+    )
+    statement = insert(WorkLogDaily).from_select(ROLLUP_COLUMNS, rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[WorkLogDaily.card_id, WorkLogDaily.user_id, WorkLogDaily.date],
+        set_={
+            "hours": WorkLogDaily.hours + statement.excluded.hours,
+            "entries": WorkLogDaily.entries + statement.excluded.entries,
+        },
+    ))
+
+
+def delete_card_rollups(db: Session, card_ids: list[int]) -> None:
+    # Al borrar tarjetas (sus worklogs se borran con ellas)
+    if card_ids:
+        db.execute(
+            delete(WorkLogDaily)
+            .where(WorkLogDaily.card_id.in_(card_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+# =========================================================
+# COMPROBACIÓN Y RECONSTRUCCIÓN
+# =========================================================
+def expected_rollups():
+    """
+    worklog_daily calculada desde cero a partir de los worklogs
+    (la usan también el mantenimiento incremental y las migraciones).
+    """
+    return (
+        select(
+            WorkLog.card_id,
+            WorkLog.user_id,
+            WorkLog.date,
+            Card.board_id,
+            func.sum(WorkLog.hours).label("hours"),
+            func.count().label("entries"),
+        )
+        .join(Card, WorkLog.card_id == Card.id)
+        .group_by(WorkLog.card_id, WorkLog.user_id, WorkLog.date, Card.board_id)
+    )
+
+
+def _matches(stored, expected) -> bool:
+    # Mismo tablero y nº de worklogs; horas salvo el orden de la suma
+    return (
+        stored[0] == expected[0]
+        and stored[2] == expected[2]
+        and abs(stored[1] - expected[1]) <= HOURS_TOLERANCE
+    )
+
+
+def repair_worklog_rollups(db: Session, board_id: Optional[int] = None, dry_run: bool = False) -> int:
+    """
+    Compara worklog_daily con los worklogs (de un tablero o de todos) y
+    corrige las filas que faltan, sobran o no cuadran.
+    Devuelve cuántas filas estaban mal.
+    """
+    expected_query = expected_rollups()
+    stored_query = select(
+        WorkLogDaily.card_id,
+        WorkLogDaily.user_id,
+        WorkLogDaily.date,
+        WorkLogDaily.board_id,
+        WorkLogDaily.hours,
+        WorkLogDaily.entries,
+    )
+    if board_id is not None:
+        expected_query = expected_query.where(Card.board_id == board_id)
+        stored_query = stored_query.where(WorkLogDaily.board_id == board_id)
+
+    expected = {
+        (row.card_id, row.user_id, row.date): (row.board_id, row.hours, row.entries)
+        for row in db.execute(expected_query)
+    }
+    stored = {
+        (row.card_id, row.user_id, row.date): (row.board_id, row.hours, row.entries)
+        for row in db.execute(stored_query)
+    }
+
+    wrong = [key for key in stored if key not in expected or not _matches(stored[key], expected[key])]
+    missing = [key for key in expected if key not in stored]
+    if dry_run or not (wrong or missing):
+        return len(wrong) + len(missing)
+
+    # Se borran las filas incorrectas y se insertan las esperadas
+    for key in wrong:
+        db.execute(
+            delete(WorkLogDaily)
+            .where(and_(
+                WorkLogDaily.card_id == key[0],
+                WorkLogDaily.user_id == key[1],
+                WorkLogDaily.date == key[2],
+            ))
+            .execution_options(synchronize_session=False)
+        )
+
+    rows = [
+        {
+            "card_id": key[0],
+            "user_id": key[1],
+            "date": key[2],
+            "board_id": expected[key][0],
+            "hours": expected[key][1],
+            "entries": expected[key][2],
+        }
+        for key in wrong + missing
+        if key in expected
+    ]
+    if rows:
+        db.execute(WorkLogDaily.__table__.insert(), rows)
+    db.commit()
+    return len(wrong) + len(missing)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Comprobar y reparar worklog_daily")
+    parser.add_argument("--board-id", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        wrong = repair_worklog_rollups(db, args.board_id, args.dry_run)
+
+    action = "incorrectas" if args.dry_run else "corregidas"
+    print(f"Filas de worklog_daily {action}: {wrong}")
+    return 1 if args.dry_run and wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Literal, Optional
+import csv
 import datetime
+import io
 from collections import defaultdict
 
 from backend.database import get_db
+from backend.async_mode import threadpool_endpoint
 from backend.auth.utils import get_current_user
+from backend.boards.utils import touch_board
+from backend.changes.utils import mark_card_changed, record_tombstone
+from backend.events.utils import event_data, publish_board_event
+from backend.reportsweek.snapshots import invalidate_report_snapshots
+from backend.cards.models import Card
 from backend.models import User
 
 from .models import WorkLog
+from .importer import import_worklogs, read_rows
+from .rollup import WorkLogKey, record_worklog_change
 from .schemas import (
     WorkLogCreate,
     WorkLogUpdate,
     WorkLogOut,
     WorkLogDayTotal,
     WorkLogsWeekSummary,
+    WorkLogImportResult,
 )
 
 # =========================================================
@@ -44,6 +56,11 @@ def create_worklog(
     if data.date > date.today():
         raise HTTPException(status_code=400, detail="Date cannot be in the future")
 
+    # La tarjeta debe existir (y nos da el tablero a versionar)
+    board_id = db.query(Card.board_id).filter(Card.id == card_id).scalar()
+    if board_id is None:
+        raise HTTPException(status_code=404, detail="Card not found")
+
     # -----------------------------
     # Crear worklog
     # -----------------------------
@@ -56,9 +73,18 @@ def create_worklog(
     )
 
     db.add(worklog)
+    version = touch_board(db, board_id)
+    worklog.row_version = version
+    mark_card_changed(db, card_id, version, hours=data.hours)
+    invalidate_report_snapshots(db, board_id, [data.date])
+    record_worklog_change(
+        db, board_id, new=WorkLogKey(card_id, current_user.id, data.date, data.hours)
+    )
     db.commit()
     db.refresh(worklog)
 
+    publish_board_event(board_id, version, "worklog.created", event_data(WorkLogOut, worklog))
+
     return worklog
 
 
@@ -105,12 +131,26 @@ def update_worklog(
     if worklog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    previous = WorkLogKey(worklog.card_id, worklog.user_id, worklog.date, worklog.hours)
     for field, value in data.dict(exclude_unset=True).items():
         setattr(worklog, field, value)
 
+    board_id = worklog.card.board_id
+    version = touch_board(db, board_id)
+    worklog.row_version = version
+    mark_card_changed(db, worklog.card_id, version, hours=worklog.hours - previous.hours)
+    invalidate_report_snapshots(db, board_id, [previous.date, worklog.date])
+    record_worklog_change(
+        db,
+        board_id,
+        old=previous,
+        new=WorkLogKey(worklog.card_id, worklog.user_id, worklog.date, worklog.hours),
+    )
     db.commit()
     db.refresh(worklog)
 
+    publish_board_event(board_id, version, "worklog.updated", event_data(WorkLogOut, worklog))
+
     return worklog
 
 
@@ -133,9 +173,18 @@ def delete_worklog(
     if worklog.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    board_id, card_id, hours = worklog.card.board_id, worklog.card_id, worklog.hours
+    previous = WorkLogKey(card_id, worklog.user_id, worklog.date, hours)
     db.delete(worklog)
+    version = touch_board(db, board_id)
+    record_tombstone(db, board_id, "worklog", worklog_id, version, card_id=card_id)
+    mark_card_changed(db, card_id, version, hours=-hours)
+    invalidate_report_snapshots(db, board_id, [previous.date])
+    record_worklog_change(db, board_id, old=previous)
     db.commit()
 
+    publish_board_event(board_id, version, "worklog.deleted", {"id": worklog_id, "card_id": card_id})
+
     return {"message": "Worklog deleted"}
 
 
@@ -231,3 +280,59 @@ def get_my_worklogs_summary(
         "by_day": by_day,
         "worklogs": worklogs,
     }
+
+
+# =========================================================
+# POST /worklogs/import
+# Importar hojas de horas (CSV o NDJSON) en lote
+# =========================================================
+@router.post("/worklogs/import", response_model=WorkLogImportResult)
+@threadpool_endpoint
+def import_worklogs_file(
+    file: UploadFile = File(..., description="CSV o NDJSON: card_id, user, date, hours, note"),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Por defecto, según el nombre del fichero"),
+    atomic: bool = Query(True, description="Si alguna fila no es válida no se importa ninguna"),
+    dry_run: bool = Query(False, description="Solo validar"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Valida cada fila con las mismas reglas que POST /cards/{card_id}/worklogs
+    (y que la tarjeta sea de un tablero del usuario) e inserta por lotes.
+    La columna user solo admite al propio usuario (vacío, su id o su email).
+    Se publica un evento "worklogs.imported" por tablero modificado.
+    """
+    import_format = format
+    if import_format is None:
+        name = (file.filename or "").lower()
+        if name.endswith(".csv"):
+            import_format = "csv"
+        elif name.endswith((".ndjson", ".jsonl")):
+            import_format = "ndjson"
+        else:
+            raise HTTPException(status_code=400, detail="Unknown file format (use ?format=csv|ndjson)")
+
+    # El fichero subido está en disco (o en memoria si es pequeño):
+    # se lee línea a línea, sin cargarlo entero
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        outcome = import_worklogs(
+            db,
+            current_user,
+            read_rows(stream, import_format),
+            atomic=atomic,
+            dry_run=dry_run,
+        )
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="File must be UTF-8")
+    except csv.Error as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    finally:
+        stream.detach()
+
+    for board_id, (version, data) in outcome.events.items():
+        publish_board_event(board_id, version, "worklogs.imported", data)
+
+    return outcome.as_dict()
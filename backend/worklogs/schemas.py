@@ -46,3 +46,23 @@ class WorkLogsWeekSummary(BaseModel):
     by_day: List[WorkLogDayTotal]
     worklogs: List[WorkLogOut]
 
+
+
+# =========================================================
+# Importación en lote (POST /worklogs/import)
+# =========================================================
+
+class WorkLogImportError(BaseModel):
+    # Línea del fichero (en CSV la cabecera es la línea 1)
+    line: int
+    detail: str
+
+
+class WorkLogImportResult(BaseModel):
+    applied: bool
+    rows: int
+    imported: int
+    errors_count: int
+    # Como mucho IMPORT_MAX_ERRORS; errors_count es el total
+    errors: List[WorkLogImportError]
+    boards: List[int]
@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+# La configuración se lee al importar backend: antes, una base SQLite
+# temporal para toda la sesión de tests
+_DB_DIR = tempfile.mkdtemp(prefix="neocare-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("NEOCARE_BCRYPT_WORKERS", "0")
+
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend import models
+from backend.cards.models import Card
+from backend.auth.utils import create_access_token
+from backend.boards.utils import provision_default_boards
+from backend.database import SessionLocal, engine
+from backend.migrations.runner import upgrade
+
+_user_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    upgrade(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture()
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def client(schema):
+    from backend.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def make_user(db):
+    """
+    Crea un usuario con su tablero inicial.
+    Devuelve (user_id, board_id, cabeceras con su token).
+    """
+
+    def _make_user(email: str | None = None):
+        email = email or f"user{next(_user_numbers)}@tests.example.com"
+        user_id = db.execute(
+            insert(models.User).returning(models.User.id),
+            [{"email": email, "password_hash": "x"}],
+        ).scalar_one()
+        board_id = provision_default_boards(db, [user_id])[user_id]
+        db.commit()
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+        return user_id, board_id, headers
+
+    return _make_user
+
+
+@pytest.fixture()
+def make_card(db):
+    """
+    Crea una tarjeta en la primera lista del tablero.
+    Devuelve su id.
+    """
+
+    def _make_card(board_id: int) -> int:
+        list_id = db.query(models.List.id).filter(models.List.board_id == board_id).first()[0]
+        card_id = db.execute(
+            insert(Card).returning(Card.id),
+            [{"title": "Tarjeta", "board_id": board_id, "list_id": list_id, "rank": "m"}],
+        ).scalar_one()
+        db.commit()
+        return card_id
+
+    return _make_card
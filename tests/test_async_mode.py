@@ -0,0 +1,49 @@
+import inspect
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+
+from backend.async_mode import asyncify_router, threadpool_endpoint
+from backend.database import get_db
+
+
+def test_asyncify_router_keeps_route_options():
+    router = APIRouter(prefix="/things", tags=["things"])
+
+    @router.get(
+        "/{thing_id}",
+        response_model_exclude_none=True,
+        response_model_by_alias=False,
+        openapi_extra={"x-internal": True},
+        callbacks=[],
+        status_code=202,
+    )
+    def read_thing(thing_id: int, db: Session = Depends(get_db)):
+        return {"id": thing_id}
+
+    route = asyncify_router(router).routes[0]
+
+    assert isinstance(route, APIRoute)
+    assert inspect.iscoroutinefunction(route.endpoint)
+    assert route.path == "/things/{thing_id}"
+    assert route.tags == ["things"]
+    assert route.status_code == 202
+    assert route.response_model_exclude_none is True
+    assert route.response_model_by_alias is False
+    assert route.openapi_extra == {"x-internal": True}
+    assert route.callbacks == []
+
+
+def test_threadpool_endpoints_stay_sync():
+    router = APIRouter()
+
+    @router.get("/report")
+    @threadpool_endpoint
+    def heavy_report(db: Session = Depends(get_db)):
+        return []
+
+    route = asyncify_router(router).routes[0]
+
+    assert route.endpoint is heavy_report
+    assert not inspect.iscoroutinefunction(route.endpoint)
@@ -0,0 +1,75 @@
+from sqlalchemy import func, select
+
+from backend.cards.models import Card
+from backend.cards.ranking import rebalance_list
+from backend.models import Board, List
+
+
+def _first_list(db, board_id):
+    return db.execute(select(List.id).where(List.board_id == board_id).order_by(List.id)).scalars().first()
+
+
+def test_create_card_rejects_a_list_from_another_board(client, db, make_user):
+    _user_id, board_id, headers = make_user()
+    _other_id, other_board_id, _other_headers = make_user()
+    foreign_list = _first_list(db, other_board_id)
+
+    response = client.post(
+        "/cards/",
+        json={"title": "Tarjeta", "board_id": board_id, "list_id": foreign_list},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "La lista no pertenece al tablero."
+
+    response = client.post(
+        "/cards/",
+        json={"title": "Tarjeta", "board_id": board_id, "list_id": 10**9},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+    cards = db.execute(select(func.count()).select_from(Card).where(Card.board_id == board_id)).scalar()
+    foreign_cards = db.execute(select(func.count()).select_from(Card).where(Card.list_id == foreign_list)).scalar()
+    assert (cards, foreign_cards) == (0, 0)
+
+
+def test_create_card_in_own_list(client, db, make_user):
+    _user_id, board_id, headers = make_user()
+    list_id = _first_list(db, board_id)
+
+    response = client.post(
+        "/cards/",
+        json={"title": "Tarjeta", "board_id": board_id, "list_id": list_id},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["list_id"] == list_id
+
+
+def test_rebalance_list_keeps_order_and_skips_empty_lists(client, db, make_user):
+    _user_id, board_id, headers = make_user()
+    list_ids = db.execute(select(List.id).where(List.board_id == board_id).order_by(List.id)).scalars().all()
+    created = [
+        client.post(
+            "/cards/",
+            json={"title": f"Tarjeta {n}", "board_id": board_id, "list_id": list_ids[0]},
+            headers=headers,
+        ).json()["id"]
+        for n in range(5)
+    ]
+
+    def board_version():
+        db.expire_all()
+        return db.execute(select(Board.version).where(Board.id == board_id)).scalar_one()
+
+    version = board_version()
+    rebalance_list(list_ids[1])
+    assert board_version() == version
+
+    rebalance_list(list_ids[0])
+    assert board_version() == version + 1
+    ordered = db.execute(
+        select(Card.id).where(Card.list_id == list_ids[0]).order_by(Card.rank)
+    ).scalars().all()
+    assert ordered == created
@@ -0,0 +1,50 @@
+import dataclasses
+import threading
+
+import pytest
+
+from backend import config
+from backend.database import PoolStats
+from backend.metrics import routes as metrics_routes
+
+
+@pytest.fixture()
+def metrics_token(monkeypatch):
+    token = "metrics-secret"
+    monkeypatch.setattr(
+        metrics_routes, "settings", dataclasses.replace(config.settings, metrics_token=token)
+    )
+    return token
+
+
+def test_metrics_disabled_without_token(client):
+    assert client.get("/metrics/").status_code == 404
+
+
+def test_metrics_require_token(client, metrics_token):
+    assert client.get("/metrics/").status_code == 401
+    assert client.get("/metrics/", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics/", headers={"Authorization": f"Bearer {metrics_token}"})
+
+    assert response.status_code == 200
+    assert "db_pool" in response.json()
+
+
+def test_pool_stats_counters_are_thread_safe():
+    stats = PoolStats()
+
+    def hammer():
+        for _ in range(20000):
+            stats.record_connect()
+            stats.record_invalidation()
+            stats.record_timeout()
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = stats.as_dict(pool=None)
+    assert (data["connects"], data["invalidations"], data["timeouts"]) == (80000, 80000, 80000)
@@ -0,0 +1,62 @@
+from sqlalchemy import select
+
+from backend import models
+from backend.auth import provision
+from backend.auth.utils import verify_password
+
+
+def _emails(db, *emails):
+    return set(db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars())
+
+
+def test_provision_stores_emails_like_register(client, db, tmp_path, capsys):
+    response = client.post("/auth/register", json={"email": "Ana.Register@tests.example.com", "password": "secret123"})
+    assert response.status_code == 201
+
+    # Mismo email que uno ya registrado: rechazado igual que en el registro
+    again = client.post("/auth/register", json={"email": "Ana.Register@tests.example.com", "password": "secret123"})
+    assert again.status_code == 400
+
+    csv_path = tmp_path / "usuarios.csv"
+    csv_path.write_text(
+        "email,password\n"
+        "Ana.Register@tests.example.com,secret123\n"
+        "Luis.Cli@tests.example.com,secret123\n",
+        encoding="utf-8",
+    )
+    assert provision.main([str(csv_path), "--workers", "1"]) == 0
+    assert "Usuarios creados: 1 de 2" in capsys.readouterr().out
+
+    # Se guardan tal cual, sin cambiar mayúsculas
+    assert _emails(db, "Ana.Register@tests.example.com", "Luis.Cli@tests.example.com") == {
+        "Ana.Register@tests.example.com",
+        "Luis.Cli@tests.example.com",
+    }
+
+    for email in ("Ana.Register@tests.example.com", "Luis.Cli@tests.example.com"):
+        login = client.post("/auth/login", data={"username": email, "password": "secret123"})
+        assert login.status_code == 200
+
+
+def test_provision_rejects_rows_that_register_rejects(db, tmp_path, capsys):
+    csv_path = tmp_path / "usuarios.csv"
+    csv_path.write_text(
+        "email,password\n"
+        "no-es-un-email,secret123\n"
+        "corta@tests.example.com,1234567\n"
+        "larga@tests.example.com," + "x" * 73 + "\n"
+        "valida@tests.example.com,secret123\n",
+        encoding="utf-8",
+    )
+    assert provision.main([str(csv_path), "--workers", "1"]) == 0
+
+    captured = capsys.readouterr()
+    assert "Usuarios creados: 1 de 1" in captured.out
+    for line in (2, 3, 4):
+        assert f"Línea {line} omitida" in captured.err
+
+    assert _emails(db, "no-es-un-email", "corta@tests.example.com", "larga@tests.example.com") == set()
+    password_hash = db.execute(
+        select(models.User.password_hash).where(models.User.email == "valida@tests.example.com")
+    ).scalar_one()
+    assert verify_password("secret123", password_hash)
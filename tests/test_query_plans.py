@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# query_plans crea su propio SQLite temporal y borra las tablas al
+# terminar: se ejecuta en otro proceso para no tocar la BD de los tests
+@pytest.mark.parametrize("aggregation", ["python", "sql"])
+def test_endpoint_queries_use_indexes(aggregation):
+    env = {**os.environ, "NEOCARE_REPORT_AGGREGATION": aggregation}
+    env.pop("DATABASE_URL", None)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "backend.query_plans", "--cards", "300", "--other-boards", "10"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+    assert "FULL SCAN" not in result.stdout, result.stdout
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "0 con recorrido completo" in result.stdout
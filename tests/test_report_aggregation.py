@@ -0,0 +1,195 @@
+import dataclasses
+import json
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert
+
+from backend import models
+from backend.cards.models import Card
+from backend.models import List
+from backend.reportsweek import aggregation, export
+from backend.worklogs.models import WorkLog
+from backend.worklogs.rollup import repair_worklog_rollups
+
+pd = pytest.importorskip("pandas")
+
+WEEK = "2025-10"
+WEEK_START = date(2025, 3, 3)
+WEEK_END = WEEK_START + timedelta(days=7)
+
+
+# =========================================================
+# Versión original con pandas (referencia)
+# =========================================================
+def pandas_hours_by_user(db, board_id):
+    rows = (
+        db.query(WorkLog.user_id, WorkLog.card_id, WorkLog.hours)
+        .join(Card, WorkLog.card_id == Card.id)
+        .filter(Card.board_id == board_id, WorkLog.date >= WEEK_START, WorkLog.date < WEEK_END)
+        .all()
+    )
+    if not rows:
+        return []
+    df = pd.DataFrame(rows, columns=["user_id", "card_id", "hours"])
+    return (
+        df.groupby("user_id")
+        .agg(total_hours=("hours", "sum"), tasks_count=("card_id", "nunique"))
+        .reset_index()
+        .to_dict(orient="records")
+    )
+
+
+def pandas_hours_by_card(db, board_id):
+    rows = (
+        db.query(
+            Card.id.label("card_id"),
+            Card.title,
+            Card.user_id.label("responsible_id"),
+            List.name.label("status"),
+            WorkLog.hours,
+        )
+        .join(WorkLog, WorkLog.card_id == Card.id)
+        .join(List, Card.list_id == List.id)
+        .filter(Card.board_id == board_id, WorkLog.date >= WEEK_START, WorkLog.date < WEEK_END)
+        .all()
+    )
+    if not rows:
+        return []
+    df = pd.DataFrame(rows, columns=["card_id", "title", "responsible_id", "status", "hours"])
+    return (
+        df.groupby(["card_id", "title", "responsible_id", "status"])
+        .agg(total_hours=("hours", "sum"))
+        .reset_index()
+        .sort_values("total_hours", ascending=False)
+        .to_dict(orient="records")
+    )
+
+
+def json_body(result) -> bytes:
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+# =========================================================
+# Datos
+# =========================================================
+@pytest.fixture()
+def seeded_board(db, make_user):
+    """
+    Tablero con decimales que no suman exacto en float, empates de
+    horas entre tarjetas y tarjetas sin responsable.
+    """
+    owner_id, board_id, headers = make_user()
+    other_ids = [make_user()[0] for _ in range(2)]
+    user_ids = [owner_id, *other_ids]
+    list_ids = [
+        list_id for (list_id,) in db.query(List.id).filter(List.board_id == board_id)
+    ]
+
+    rng = random.Random(18)
+    card_ids = db.execute(
+        insert(Card).returning(Card.id),
+        [
+            {
+                "title": f"Tarjeta {i}",
+                "board_id": board_id,
+                "list_id": rng.choice(list_ids),
+                "rank": f"r{i:03d}",
+                "user_id": None if i % 7 == 0 else rng.choice(user_ids),
+            }
+            for i in range(60)
+        ],
+    ).scalars().all()
+
+    pattern = [0.1, 0.7, 0.2, 1 / 3, 0.3]
+    worklogs = []
+    for index, card_id in enumerate(card_ids):
+        # La mitad de las tarjetas repite el mismo patrón (empates)
+        hours = pattern if index % 2 else [rng.choice([0.1, 0.2, 0.25, 0.7, 1.1, 2.0]) for _ in range(12)]
+        for hour in hours:
+            worklogs.append({
+                "card_id": card_id,
+                "user_id": rng.choice(user_ids),
+                "date": WEEK_START + timedelta(days=rng.randrange(7)),
+                "hours": hour,
+            })
+    rng.shuffle(worklogs)
+    db.execute(insert(WorkLog), worklogs)
+    db.commit()
+    repair_worklog_rollups(db, board_id)
+    return board_id, headers
+
+
+# =========================================================
+# Tests
+# =========================================================
+def test_hours_by_user_matches_pandas(client, db, seeded_board):
+    board_id, headers = seeded_board
+
+    response = client.get(f"/report/{board_id}/hours-by-user?week={WEEK}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == json_body(pandas_hours_by_user(db, board_id))
+
+
+def test_hours_by_card_matches_pandas(client, db, seeded_board):
+    board_id, headers = seeded_board
+
+    response = client.get(f"/report/{board_id}/hours-by-card?week={WEEK}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == json_body(pandas_hours_by_card(db, board_id))
+    # Con tarjetas sin responsable pandas devolvía responsible_id float
+    assert all(isinstance(row["responsible_id"], float) for row in response.json())
+
+
+def test_hours_by_card_keeps_int_responsible_without_nulls(client, db, make_user):
+    user_id, board_id, headers = make_user()
+    list_id = db.query(List.id).filter(List.board_id == board_id).first()[0]
+    card_ids = db.execute(
+        insert(Card).returning(Card.id),
+        [
+            {"title": f"T{i}", "board_id": board_id, "list_id": list_id, "rank": f"r{i}", "user_id": user_id}
+            for i in range(3)
+        ],
+    ).scalars().all()
+    db.execute(insert(WorkLog), [
+        {"card_id": card_id, "user_id": user_id, "date": WEEK_START, "hours": 1.5}
+        for card_id in card_ids
+    ])
+    db.commit()
+
+    response = client.get(f"/report/{board_id}/hours-by-card?week={WEEK}", headers=headers)
+
+    assert response.content == json_body(pandas_hours_by_card(db, board_id))
+    assert all(isinstance(row["responsible_id"], int) for row in response.json())
+
+
+def test_empty_week_returns_empty_list(client, make_user):
+    _user_id, board_id, headers = make_user()
+
+    for report in ("hours-by-user", "hours-by-card"):
+        response = client.get(f"/report/{board_id}/{report}?week={WEEK}", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+@pytest.mark.parametrize("mode", ["python", "sql"])
+@pytest.mark.parametrize("report", ["hours-by-user", "hours-by-card"])
+def test_export_matches_report(client, seeded_board, monkeypatch, mode, report):
+    board_id, headers = seeded_board
+    for module in (aggregation, export):
+        monkeypatch.setattr(module, "settings", dataclasses.replace(module.settings, report_aggregation=mode))
+
+    expected = client.get(f"/report/{board_id}/{report}?week={WEEK}", headers=headers).json()
+    response = client.get(
+        f"/report/{board_id}/export/{report}",
+        params={"from": WEEK_START.isoformat(), "to": (WEEK_END - timedelta(days=1)).isoformat(), "format": "ndjson"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
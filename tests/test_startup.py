@@ -0,0 +1,35 @@
+import statistics
+from pathlib import Path
+
+import pytest
+
+from backend import startup_check
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+
+
+@pytest.fixture(scope="module")
+def profiles(tmp_path_factory):
+    # Procesos nuevos con -X importtime (el primero calienta la caché de bytecode)
+    env = startup_check.child_environment(f"sqlite:///{tmp_path_factory.mktemp('startup')}/startup.db")
+    startup_check.import_profile(env, ROOT)
+    return [startup_check.import_profile(env, ROOT) for _ in range(5)]
+
+
+def test_heavy_modules_not_imported_at_startup(profiles):
+    loaded = {name.split(".")[0] for _cumulative, _depth, name in profiles[0]["modules"]}
+
+    assert not loaded & set(startup_check.HEAVY_MODULES)
+
+
+def test_import_time_within_budget(profiles):
+    # El mejor de varios: la carga de la máquina solo puede sumar tiempo
+    import_ms = min(profile["import_ms"] for profile in profiles)
+
+    assert import_ms <= startup_check.IMPORT_BUDGET_MS
+
+
+def test_rss_within_budget(profiles):
+    rss_mb = statistics.median(profile["rss_mb"] for profile in profiles)
+
+    assert rss_mb <= startup_check.RSS_BUDGET_MB
@@ -0,0 +1,81 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from backend.models import User
+from backend.worklogs import importer
+from backend.worklogs.models import WorkLog
+from backend.worklogs.rollup import repair_worklog_rollups
+
+DAY = date(2025, 3, 4).isoformat()
+NO_ACCESS = "You do not have access to this board"
+
+
+def upload(client, headers, lines: list[str], **params):
+    body = "\n".join(["card_id,user,date,hours,note", *lines]) + "\n"
+    return client.post(
+        "/worklogs/import", params=params, files={"file": ("horas.csv", body)}, headers=headers
+    )
+
+
+def worklog_users(db, card_id: int) -> list[int]:
+    return db.scalars(
+        select(WorkLog.user_id).where(WorkLog.card_id == card_id).order_by(WorkLog.id)
+    ).all()
+
+
+def test_import_as_the_importing_user(client, db, make_user, make_card):
+    user_id, board_id, headers = make_user()
+    card_id = make_card(board_id)
+    email = db.scalar(select(User.email).where(User.id == user_id))
+
+    response = upload(client, headers, [
+        f"{card_id},,{DAY},1.5,",
+        f"{card_id},{user_id},{DAY},0.1,por id",
+        f"{card_id},{email},{DAY},0.2,por email",
+    ])
+
+    assert response.status_code == 200
+    assert response.json()["imported"] == 3
+    assert worklog_users(db, card_id) == [user_id] * 3
+    assert repair_worklog_rollups(db, board_id, dry_run=True) == 0
+
+
+def test_import_rejects_other_users_without_revealing_them(client, db, make_user, make_card):
+    _user_id, board_id, headers = make_user()
+    other_id, _other_board, _ = make_user("colleague@tests.example.com")
+    card_id = make_card(board_id)
+
+    for dry_run in (True, False):
+        response = upload(client, headers, [
+            f"{card_id},colleague@tests.example.com,{DAY},1,",
+            f"{card_id},nobody@tests.example.com,{DAY},1,",
+            f"{card_id},{other_id},{DAY},1,",
+            f"{card_id},999999,{DAY},1,",
+        ], atomic=False, dry_run=dry_run)
+
+        body = response.json()
+        assert body["imported"] == 0
+        # Existan o no, el mismo error que un tablero ajeno
+        assert [error["detail"] for error in body["errors"]] == [NO_ACCESS] * 4
+
+    assert worklog_users(db, card_id) == []
+
+
+def test_cli_can_attribute_to_other_users(db, make_user, tmp_path, make_card):
+    _user_id, board_id, _headers = make_user("operator@tests.example.com")
+    other_id, _other_board, _ = make_user("member@tests.example.com")
+    card_id = make_card(board_id)
+
+    path = tmp_path / "horas.csv"
+    path.write_text(
+        "card_id,user,date,hours,note\n"
+        f"{card_id},member@tests.example.com,{DAY},2,\n"
+        f"{card_id},nobody@tests.example.com,{DAY},1,\n"
+    )
+
+    exit_code = importer.main([str(path), "--user-email", "operator@tests.example.com", "--partial"])
+
+    assert exit_code == 1
+    assert worklog_users(db, card_id) == [other_id]
+    assert db.scalar(select(func.count()).select_from(WorkLog).where(WorkLog.card_id == card_id)) == 1
@@ -0,0 +1,83 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from backend.worklogs.models import WorkLogDaily
+from backend.worklogs.rollup import repair_worklog_rollups
+
+DAY = date(2025, 3, 4)
+
+
+def rollup_rows(db, card_id: int) -> list:
+    return db.execute(
+        select(WorkLogDaily.date, WorkLogDaily.hours, WorkLogDaily.entries)
+        .where(WorkLogDaily.card_id == card_id)
+        .order_by(WorkLogDaily.date)
+    ).all()
+
+
+def test_rollup_keeps_unrounded_hours(client, db, make_user, make_card):
+    _user_id, board_id, headers = make_user()
+    card_id = make_card(board_id)
+
+    # Más decimales de los que cabían en millonésimas de hora
+    hours = 0.1234567891
+    response = client.post(
+        f"/cards/{card_id}/worklogs", json={"date": DAY.isoformat(), "hours": hours}, headers=headers
+    )
+    assert response.status_code == 200
+
+    assert rollup_rows(db, card_id) == [(DAY, hours, 1)]
+
+
+def test_rollup_follows_edits_and_deletes(client, db, make_user, make_card):
+    _user_id, board_id, headers = make_user()
+    card_id = make_card(board_id)
+
+    ids = []
+    for hours in (0.1, 0.2, 0.7):
+        response = client.post(
+            f"/cards/{card_id}/worklogs", json={"date": DAY.isoformat(), "hours": hours}, headers=headers
+        )
+        ids.append(response.json()["id"])
+    assert rollup_rows(db, card_id) == [(DAY, 0.1 + 0.2 + 0.7, 3)]
+
+    # Editar y volver al valor original no deja restos de redondeo
+    client.patch(f"/worklogs/{ids[0]}", json={"hours": 0.3}, headers=headers)
+    client.patch(f"/worklogs/{ids[0]}", json={"hours": 0.1}, headers=headers)
+    assert rollup_rows(db, card_id) == [(DAY, 0.1 + 0.2 + 0.7, 3)]
+
+    client.delete(f"/worklogs/{ids[1]}", headers=headers)
+    assert rollup_rows(db, card_id) == [(DAY, 0.1 + 0.7, 2)]
+
+    # Sin worklogs ese día, sin fila
+    for worklog_id in (ids[0], ids[2]):
+        client.delete(f"/worklogs/{worklog_id}", headers=headers)
+    assert rollup_rows(db, card_id) == []
+
+    assert repair_worklog_rollups(db, board_id, dry_run=True) == 0
+
+
+def test_week_summary_totals(client, db, make_user, make_card):
+    _user_id, board_id, headers = make_user()
+    card_ids = [make_card(board_id) for _ in range(2)]
+
+    for card_id, day, hours in [
+        (card_ids[0], DAY, 1.5),
+        (card_ids[1], DAY, 0.25),
+        (card_ids[0], date(2025, 3, 6), 2.0),
+    ]:
+        client.post(
+            f"/cards/{card_id}/worklogs", json={"date": day.isoformat(), "hours": hours}, headers=headers
+        )
+
+    response = client.get("/users/me/worklogs/summary?week=2025-10", headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_week_hours"] == 3.75
+    assert body["by_day"] == [
+        {"date": "2025-03-04", "hours": 1.75},
+        {"date": "2025-03-06", "hours": 2.0},
+    ]
+    assert len(body["worklogs"]) == 3